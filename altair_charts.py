@@ -0,0 +1,78 @@
+from functools import partial
+
+import altair as alt
+
+
+# Altair drawers of the dashboard charts: aggregated data in (see charts.py),
+# Vega-Lite chart out. Only the data and the spec are sent; the browser draws the chart.
+
+def labelled_columns(data, column, y, y_title, title, color=None):
+    """Vertical bars of `y` per `column`, in data order, labelled with count and percentage."""
+    base = alt.Chart(data, title=title).encode(
+        x=alt.X(f'{column}:N', sort=None, title=None, axis=alt.Axis(labelAngle=0, labelLimit=120)),
+        y=alt.Y(f'{y}:Q', title=y_title, scale=alt.Scale(domainMax=float(data[y].max()) * 1.2)),
+    )
+    if color is None:
+        bars = base.mark_bar(color='skyblue')
+    else:
+        bars = base.mark_bar().encode(color=alt.Color(f'{column}:N', sort=None, legend=None, scale=alt.Scale(scheme=color)))
+    bars = bars.encode(tooltip=[alt.Tooltip(f'{column}:N'), alt.Tooltip(f'{y}:Q', format=','),
+                                alt.Tooltip('Percentage:Q', format='.1f')])
+
+    counts = base.mark_text(baseline='bottom', dy=-2, fontSize=9).encode(text=alt.Text(f'{y}:Q', format=','))
+    percentages = base.transform_calculate(Share='datum.Percentage / 100').mark_text(
+        baseline='bottom', dy=-16, fontWeight='bold', color='green').encode(text=alt.Text('Share:Q', format='.1%'))
+    return (bars + counts + percentages).properties(height=400)
+
+
+def ranked_bars(data, title, x_title, color):
+    """Horizontal bars of quantity sold per product, largest first."""
+    base = alt.Chart(data, title=title).encode(
+        x=alt.X('Qty Sold:Q', title=x_title),
+        y=alt.Y('Product Name:N', sort='-x', title='Product Name', axis=alt.Axis(labelLimit=300)),
+    )
+    bars = base.mark_bar(color=color).encode(tooltip=['Product Name:N', alt.Tooltip('Qty Sold:Q', format=',')])
+    values = base.mark_text(align='right', dx=-3, color='white', fontWeight='bold').encode(
+        text=alt.Text('Qty Sold:Q', format=','))
+    return bars + values
+
+
+def grouped_bars(data, title, x_title):
+    """Horizontal bars of quantity sold per product, one bar per month."""
+    base = alt.Chart(data, title=title).encode(
+        x=alt.X('Qty Sold:Q', title=x_title),
+        y=alt.Y('Product Name:N', title='Product Name', axis=alt.Axis(labelLimit=300)),
+        yOffset=alt.YOffset('Month:N', sort=None),
+    )
+    bars = base.mark_bar().encode(color=alt.Color('Month:N', sort=None),
+                                  tooltip=['Product Name:N', 'Month:N', alt.Tooltip('Qty Sold:Q', format=',')])
+    values = base.mark_text(align='left', dx=3, fontSize=9).encode(text=alt.Text('Qty Sold:Q', format=','))
+    return bars + values
+
+
+def altair_category_counts(data):
+    return labelled_columns(data, 'Product Category', 'Count', 'Number of Products',
+                            'Individual Distribution of Product Categories')
+
+
+def altair_qty_by(data, column, label):
+    return labelled_columns(data, column, 'Qty Sold', 'Total Quantity Sold',
+                            f'Total Quantity Sold by {label}', color='viridis')
+
+
+
+# Chart id -> drawing function
+ALTAIR_CHARTS = {
+    'category_counts': altair_category_counts,
+    'category_sales': partial(altair_qty_by, column='Product Category', label='Product Category'),
+    'rating_category_sales': partial(altair_qty_by, column='Rating_cat', label='Rating Category'),
+    'price_category_sales': partial(altair_qty_by, column='Price_cat', label='Price Category'),
+    'top_10_products': partial(ranked_bars, title='Top 10 Products by Quantity Sold',
+                               x_title='Quantity Sold', color='skyblue'),
+    'high_sales_top_10': partial(ranked_bars, title='Top 10 Products with Potential High Sales',
+                                 x_title='Total Quantity Sold', color='#0c424e'),
+    'growth_3_months': partial(grouped_bars, title='Month-on-Month Positive Growth (3 Months)',
+                               x_title='Total Quantity Sold'),
+    'growth_2_months': partial(grouped_bars, title='+ve GROWTH for Current vs Last Month (2 Months)',
+                               x_title='Quantity Sold'),
+}
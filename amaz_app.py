@@ -1,59 +1,58 @@
-import streamlit as st
-from stories import show_stories
-from Amazon_dashboard import show_Amazon_dashboard
-from Decision import show_Decision
-import numpy as np
-from google.cloud import bigquery
-from rich.text import Text
-import textwrap
-import os
-import toml
-from google.oauth2 import service_account
-from google.auth import default
-
-
-
-
-credentials_info = st.secrets["GOOGLE_CREDENTIAL_FOR_AMAZON"]
-
-credentials = service_account.Credentials.from_service_account_info(credentials_info)
-
-# Initialize BigQuery Client with correct credentials
-client = bigquery.Client(credentials=credentials, project=credentials.project_id)
-
+import importlib
+from contextlib import nullcontext
 
+import streamlit as st
+from filters import apply_filters, sidebar_filters
+from instrument import add_rows_out, collect, panel, show_timings
+from memory_report import show_memory_report
+from sales_data import load_data
 
-# Define  SQL query to load data
-query = """
-SELECT *
-FROM `amaz-project-438116.Existing_data.Sales` 
-LIMIT 1000  
-"""
 
-# Load data into a DataFrame
-df = client.query(query).to_dataframe()
+# Page name -> (module, function). A page module is only imported the first time
+# its page is selected, so opening one page never loads the others.
+PAGES = {
+    'Decision': ('Decision', 'show_Decision'),
+    'Dashboard': ('Amazon_dashboard', 'show_Amazon_dashboard'),
+    'Explore': ('stories', 'show_stories'),
+}
 
 
 
 # Add the custom bar
 
 st.markdown(
-    "<h1 style='color:grey; font-size: 24px; font-weight: bold; font-style: italic;'>Welcome to <span style='color:#BD7E58; font-size: 32px; font-weight: bold; font-style: italic;'>SellerWave</h1>", 
+    "<h1 style='color:grey; font-size: 24px; font-weight: bold; font-style: italic;'>Welcome to <span style='color:#BD7E58; font-size: 32px; font-weight: bold; font-style: italic;'>SellerWave</h1>",
     unsafe_allow_html=True
 )
 
 
-page = st.selectbox('', ('Decision', 'Dashboard', 'Explore'))
+page = st.selectbox('', tuple(PAGES))
+
+
 
+# Add ?debug=1 to the URL to see where the time of every rerun goes, in the sidebar
+debug = st.query_params.get('debug') == '1'
 
+with collect() if debug else nullcontext() as records:
 
+    # Load data into a DataFrame (shared, cached loader), once the page header is on screen
+    with panel('app', 'load_data'):
+        df = load_data()
+        add_rows_out(len(df))
 
-if page == 'Dashboard':
-    show_Amazon_dashboard(df)
-elif page == 'Decision':
-    show_Decision(df)
-else:
-    show_stories(df)
-    
+    # Sidebar filters. The filtered frame is memoized with a fingerprint of its own,
+    # so changing a filter reuses the loaded data and every cache keyed on it.
+    with panel('app', 'filters', rows_in=len(df)):
+        df = apply_filters(df, sidebar_filters(df))
+        add_rows_out(len(df))
 
+    module, function = PAGES[page]
+    if df.empty:
+        st.warning('No sales match these filters.')
+    else:
+        with panel(module, 'page', rows_in=len(df)):
+            getattr(importlib.import_module(module), function)(df)
 
+if debug:
+    show_timings(records)
+    show_memory_report(df)
@@ -0,0 +1,117 @@
+"""Time every panel of the pages on synthetic data, without a browser or BigQuery.
+
+    python benchmark.py --rows 1000 100000 1000000
+    python benchmark.py --rows 100000 --pages Decision --csv results.csv 2>/dev/null
+
+Each page runs headlessly: Streamlit calls are no-ops outside `streamlit run`
+(they only warn about it, on stderr).
+
+For every data size the pages run twice: "cold" right after clearing every
+Streamlit cache, as on a fresh server, and "warm" on the same data, as on a
+rerun. Peak memory comes from a separate cold run under tracemalloc, so the
+timings are not slowed down by tracing. That run computes one panel at a
+time, since peaks of panels running together would mix; the timed runs use
+`--workers` panel threads (see panel_pool).
+"""
+import argparse
+import importlib
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+
+import panel_pool
+from instrument import collect, panel
+from synthetic import make_sales
+
+
+# Page module -> function drawing the page
+PAGES = {
+    "Decision": "show_Decision",
+    "stories": "show_stories",
+    "Amazon_dashboard": "show_Amazon_dashboard",
+}
+
+
+
+def clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def run_pages(df, pages):
+    """Run `pages` on `df` and return the panel records (see instrument.panel).
+
+    Each page is also measured as a whole, as its "page" panel.
+    """
+    with collect() as records:
+        for page in pages:
+            with panel(page, "page", rows_in=len(df)):
+                getattr(importlib.import_module(page), PAGES[page])(df)
+    return records
+
+
+def benchmark(rows, pages=tuple(PAGES), n_months=6, seed=0, workers=panel_pool.PANEL_WORKERS):
+    """Per panel timings and peak memory for every size in `rows`, as one frame.
+
+    Charts are only rendered on cold runs (warm runs hit the chart cache), so
+    their warm_ms is empty.
+    """
+    results = []
+    for n_rows in rows:
+        df = make_sales(n_rows, n_months=n_months, seed=seed)
+
+        panel_pool.PANEL_WORKERS = workers
+        clear_caches()
+        cold = run_pages(df, pages)
+        warm = run_pages(df, pages)
+
+        panel_pool.PANEL_WORKERS = 1
+        clear_caches()
+        tracemalloc.start()
+        try:
+            traced = run_pages(df, pages)
+        finally:
+            tracemalloc.stop()
+            panel_pool.PANEL_WORKERS = workers
+
+        warm_seconds = {(record["page"], record["panel"]): record["seconds"] for record in warm}
+        peak_bytes = {(record["page"], record["panel"]): record["peak_bytes"] for record in traced}
+        for record in cold:
+            key = (record["page"], record["panel"])
+            results.append({
+                "rows": n_rows,
+                "page": record["page"],
+                "panel": record["panel"],
+                "rows_out": record["rows_out"],
+                "cold_ms": record["seconds"] * 1000,
+                "warm_ms": warm_seconds[key] * 1000 if key in warm_seconds else None,
+                "peak_mb": peak_bytes[key] / 2**20 if peak_bytes.get(key) is not None else None,
+            })
+    return pd.DataFrame(results).astype({"rows_out": "Int64"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="data sizes to run (rows), from 1k to 10M")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--months", type=int, default=6, help="months of data (1-12)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=panel_pool.PANEL_WORKERS,
+                        help="panel threads per page (1: one panel after the other)")
+    parser.add_argument("--csv", help="also write the results to this CSV file")
+    args = parser.parse_args()
+
+    results = benchmark(args.rows, args.pages, args.months, args.seed, args.workers)
+    with pd.option_context("display.max_rows", None, "display.width", 120):
+        print(results.to_string(index=False, float_format="{:,.1f}".format))
+        print()
+        pages = results[results["panel"] == "page"]
+        print(pages[["rows", "page", "cold_ms", "warm_ms", "peak_mb"]].to_string(index=False, float_format="{:,.1f}".format))
+    if args.csv:
+        results.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import streamlit as st
+
+from instrument import add_rows_out, panel
+
+
+logger = logging.getLogger(__name__)
+
+# "altair" sends the aggregated data to the browser, which draws the chart (Vega-Lite);
+# "matplotlib" draws on the server and ships a PNG. Only the selected backend's
+# module (altair_charts / mpl_charts) and plotting library are ever imported.
+CHART_BACKEND = os.environ.get("SELLERWAVE_CHART_BACKEND", "altair")
+
+# Upper bound on the memory held by cached charts
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Processes rasterizing matplotlib charts, so renders run on every core instead of
+# taking turns on the GIL. 0 renders in the calling thread (the default on one core).
+_CPUS = os.cpu_count() or 1
+RENDER_PROCESSES = int(os.environ.get("SELLERWAVE_RENDER_PROCESSES", min(4, _CPUS) if _CPUS > 1 else 0))
+
+
+
+# AGGREGATION (always on the server; the results are small frames)
+
+def category_counts(df):
+    """Number of rows per product category, most common first, with their share of all rows."""
+    counts = df['Product Category'].value_counts()
+    counts = counts[counts > 0]  # Categorical columns also count categories with no rows
+    return pd.DataFrame({
+        'Product Category': counts.index.astype(str),
+        'Count': counts.to_numpy(),
+        'Percentage': counts.to_numpy() / len(df) * 100,
+    })
+
+
+def qty_by(df, column, sort_by='Qty Sold'):
+    """Total quantity sold per value of `column`, with its share of the total.
+
+    Sorted by quantity (largest first), or alphabetically when `sort_by` is `column`.
+    """
+    # observed=True: only categories present in the data; labels as plain text for plotting
+    sales = df.groupby(column, observed=True)['Qty Sold'].sum().reset_index().astype({column: str})
+    sales['Percentage'] = sales['Qty Sold'] / sales['Qty Sold'].sum() * 100
+    return sales.sort_values(by=sort_by, ascending=sort_by == column)
+
+
+def top_products(df, n=10):
+    """The `n` products with the most quantity sold."""
+    product_sales = df.groupby('Product Name', observed=True)['Qty Sold'].sum().reset_index()
+    top = product_sales.sort_values(by='Qty Sold', ascending=False).head(n)
+    return top.astype({'Product Name': str})
+
+
+def top_high_sales_products(df, products, n=10):
+    """The `n` products of `products` (potential high sales) with the most quantity sold."""
+    high_sales_data = df[df['Product Name'].isin(products)]
+    high_sales_qty = high_sales_data.groupby('Product Name', observed=True)['Qty Sold'].sum().reset_index()
+    return high_sales_qty.nlargest(n, 'Qty Sold').astype({'Product Name': str})
+
+
+def growth_by_month(growth, months):
+    """Growth table (see sales_trends.month_growth) as one row per product and month."""
+    return growth.melt(id_vars='Product Name', value_vars=months, var_name='Month', value_name='Qty Sold')
+
+
+
+class ChartCache:
+    """Least recently used cache of rendered charts, capped in total size."""
+
+    def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._charts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._charts.get(key)
+            if entry is None:
+                return None
+            self._charts.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, chart, nbytes):
+        with self._lock:
+            if key in self._charts:
+                self.nbytes -= self._charts.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+
+            self._charts[key] = (chart, nbytes)
+            self.nbytes += nbytes
+
+            # Evict the least recently used charts until we are back under the cap
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._charts.popitem(last=False)
+                self.nbytes -= evicted
+
+
+@st.cache_resource(show_spinner=False)
+def get_chart_cache():
+    """Return the process-wide chart cache, shared by every session."""
+    return ChartCache()
+
+
+
+@st.cache_resource(show_spinner=False)
+def get_render_pool(processes):
+    """Return the process-wide pool of `processes` chart rendering processes."""
+    # Never fork: the server process runs threads (sessions, refreshers, panel pool)
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(method))
+
+
+def rasterize(draw, data):
+    """PNG bytes of matplotlib drawer `draw` (see mpl_charts) on aggregated `data`.
+
+    Rendered by the render pool when there is one: only `data`, a small frame,
+    and the PNG cross the process boundary, along with the figure counts of
+    the render, added to this process's tracker. A pool whose process died is
+    replaced, and the chart rendered here meanwhile.
+    """
+    from figures import render_png, render_png_counted, tracker
+
+    if RENDER_PROCESSES <= 0:
+        return render_png(draw, data)
+    try:
+        image, created, released = get_render_pool(RENDER_PROCESSES).submit(render_png_counted, draw, data).result()
+    except BrokenProcessPool:
+        logger.warning("chart render pool broken, rendering in process")
+        get_render_pool.clear()
+        return render_png(draw, data)
+    tracker.count(created, released)
+    return image
+
+
+def render_chart(chart_id, data, backend=CHART_BACKEND):
+    """Draw chart `chart_id` from its aggregated data; returns (chart, size in bytes)."""
+    if backend == "altair":
+        from altair_charts import ALTAIR_CHARTS
+
+        chart = ALTAIR_CHARTS[chart_id](data)
+        return chart, int(data.memory_usage(deep=True).sum())
+
+    from mpl_charts import MATPLOTLIB_CHARTS
+
+    image = rasterize(MATPLOTLIB_CHARTS[chart_id], data)
+    return image, len(image)
+
+
+def get_chart(chart_id, key, aggregate, backend=CHART_BACKEND):
+    """Return chart `chart_id`, calling `aggregate()` (which returns its data) only on a cache miss.
+
+    `key` identifies the data behind the chart, normally the dataset fingerprint.
+    Draws nothing, so it may run in a panel pool thread (see panel_pool).
+    """
+    cache = get_chart_cache()
+    chart = cache.get((backend, chart_id, key))
+    if chart is None:
+        # Measured as a panel of its own, inside the panel showing the chart
+        with panel(None, f"chart {chart_id}"):
+            data = aggregate()
+            add_rows_out(len(data))
+            chart, nbytes = render_chart(chart_id, data, backend)
+        cache.put((backend, chart_id, key), chart, nbytes)
+    return chart
+
+
+def draw_chart(chart, backend=CHART_BACKEND):
+    """Display a chart returned by get_chart."""
+    if backend == "altair":
+        st.altair_chart(chart, width="stretch")
+    else:
+        st.image(chart, width="stretch")
+
+
+def show_chart(chart_id, key, aggregate, backend=CHART_BACKEND):
+    """Display chart `chart_id` (see get_chart)."""
+    draw_chart(get_chart(chart_id, key, aggregate, backend), backend)
@@ -0,0 +1,106 @@
+import io
+import logging
+import threading
+import weakref
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from instrument import rss_bytes
+
+
+logger = logging.getLogger(__name__)
+
+# Same PNG settings st.pyplot uses
+SAVEFIG_OPTIONS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+
+
+class FigureTracker:
+    """Counts the figures created and released by this process.
+
+    Figures never go through pyplot, so nothing global keeps them alive: `live`
+    is the number of figures still referenced anywhere, which should go back to
+    zero after every render. Figures drawn by render pool processes (see
+    charts.rasterize) are counted here too, as they come back.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.released = 0
+        self._live = weakref.WeakSet()
+        self._remote_live = 0
+        self._lock = threading.Lock()
+
+    def add(self, fig):
+        with self._lock:
+            self.created += 1
+            self._live.add(fig)
+
+    def release(self, fig):
+        fig.clear()
+        with self._lock:
+            self.released += 1
+            self._live.discard(fig)
+
+    def count(self, created, released):
+        """Add figures created and released by another process (see render_png_counted)."""
+        with self._lock:
+            self.created += created
+            self.released += released
+            self._remote_live += created - released
+
+    @property
+    def live(self):
+        with self._lock:
+            return len(self._live) + self._remote_live
+
+
+tracker = FigureTracker()
+
+
+def figure_stats():
+    """Live and total figure counts, and the resident memory of the process."""
+    return {
+        "live": tracker.live,
+        "created": tracker.created,
+        "released": tracker.released,
+        "rss_bytes": rss_bytes(),
+    }
+
+
+
+def new_figure(figsize):
+    """A figure of its own for one render, on the Agg canvas and outside pyplot."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    tracker.add(fig)
+    return fig
+
+
+def render_png(draw, *args):
+    """Call `draw(*args)` (which returns a figure from new_figure) and rasterize it to PNG bytes.
+
+    The figure is always released, even when drawing fails.
+    """
+    fig = None
+    try:
+        fig = draw(*args)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, **SAVEFIG_OPTIONS)
+        return buffer.getvalue()
+    finally:
+        if fig is not None:
+            tracker.release(fig)
+        logger.info("chart rendered: %s", figure_stats())
+
+
+def render_png_counted(draw, *args):
+    """render_png for a render pool process: returns the PNG bytes and the figures created and released.
+
+    The caller adds those to its own tracker (FigureTracker.count), since this
+    process's tracker is never seen.
+    """
+    created, released = tracker.created, tracker.released
+    image = render_png(draw, *args)
+    return image, tracker.created - created, tracker.released - released
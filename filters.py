@@ -0,0 +1,64 @@
+import hashlib
+import re
+
+import streamlit as st
+
+from sales_data import MAX_DATASETS, fingerprint, issue_frame, prepare_data
+from sales_index import take_rows
+
+
+# Sidebar filters: column -> label. An empty selection keeps every value.
+FILTER_COLUMNS = {
+    "Product Category": "Product category",
+    "Price_cat": "Price band",
+    "Rating_cat": "Rating band",
+}
+
+
+
+def band_order(label):
+    """Sort key putting price bands in numeric order ($0-20 before $100+)."""
+    numbers = re.findall(r"\d+", label)
+    return (int(numbers[0]) if numbers else float("inf"), label)
+
+
+def sidebar_filters(df):
+    """Draw the sidebar filters for `df` and return the selection, as a tuple of (column, values) pairs.
+
+    Only filters that exclude something are returned, so "no filter" is ().
+    """
+    st.sidebar.header("Filters")
+    filters = []
+
+    for column, label in FILTER_COLUMNS.items():
+        options = sorted(df[column].dropna().unique(), key=band_order if column == "Price_cat" else str)
+        selected = st.sidebar.multiselect(label, options, placeholder="All", key=f"filter_{column}")
+        if selected:
+            filters.append((column, tuple(selected)))
+
+    # Month window, in collection order
+    months = prepare_data(df).months
+    if len(months) > 1:
+        first, last = st.sidebar.select_slider("Months", options=months, value=(months[0], months[-1]), key="filter_months")
+        window = months[months.index(first):months.index(last) + 1]
+        if len(window) < len(months):
+            filters.append(("Month", tuple(window)))
+
+    return tuple(filters)
+
+
+@st.cache_resource(max_entries=MAX_DATASETS, show_spinner=False)
+def _cached_filtered(key, filters, _df):
+    # A fingerprint of its own, so every per-dataset cache downstream keys on the filtered data
+    filters_hash = hashlib.sha1(repr(filters).encode()).hexdigest()[:12]
+    return issue_frame(take_rows(_df, filters), f"{key}/{filters_hash}")
+
+
+def apply_filters(df, filters):
+    """Return `df` filtered by `filters`, computed once per dataset and selection.
+
+    The result is shared by every session with the same selection: read it, never modify it.
+    """
+    if not filters:
+        return df
+    return _cached_filtered(fingerprint(df), filters, df)
@@ -0,0 +1,211 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+
+logger = logging.getLogger(__name__)
+
+# Set SELLERWAVE_METRICS_LOG=1 to log every panel record as one JSON line
+METRICS_LOG = os.environ.get("SELLERWAVE_METRICS_LOG") == "1"
+
+# Local metrics log: one JSON line per data load (see `write_metrics`)
+METRICS_PATH = os.environ.get("SELLERWAVE_METRICS_PATH", os.path.join(".cache", "metrics.jsonl"))
+
+# Callbacks receiving one record per finished panel (see `panel`)
+_listeners = []
+_lock = threading.Lock()
+
+# The innermost running panel, and the list collecting the records of the
+# current rerun (see `collect`). Both are per thread, so sessions never mix.
+_current = contextvars.ContextVar("sellerwave_panel", default=None)
+_collected = contextvars.ContextVar("sellerwave_collected", default=None)
+
+
+
+def rss_bytes():
+    """Resident memory of this process, or None where it cannot be read (non-Linux)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def add_listener(listener):
+    """Call `listener(record)` after every panel; returns `listener` so it can be removed later."""
+    with _lock:
+        _listeners.append(listener)
+    return listener
+
+
+def remove_listener(listener):
+    with _lock:
+        _listeners.remove(listener)
+
+
+def log_record(record):
+    """Listener writing `record` to the log as JSON, for production metrics."""
+    logger.info(json.dumps({"event": "panel", **record}))
+
+
+def write_metrics(event, **fields):
+    """Append one event to the local metrics log (METRICS_PATH), as a JSON line.
+
+    Metrics never break the app: a log that cannot be written is only warned about.
+    """
+    line = json.dumps({"time": datetime.now(timezone.utc).isoformat(), "event": event, **fields}, default=str)
+    logger.info(line)
+    try:
+        with _lock:
+            os.makedirs(os.path.dirname(METRICS_PATH) or ".", exist_ok=True)
+            with open(METRICS_PATH, "a") as metrics:
+                metrics.write(line + "\n")
+    except OSError as error:
+        logger.warning("could not write the metrics log %s: %s", METRICS_PATH, error)
+
+
+@contextmanager
+def collect():
+    """Gather the records of the panels run inside the `with` block, in this thread only."""
+    records = []
+    token = _collected.set(records)
+    try:
+        yield records
+    finally:
+        _collected.reset(token)
+
+
+def add_rows_out(n_rows):
+    """Count `n_rows` rows produced by the running panel (tables and charts report theirs)."""
+    frame = _current.get()
+    if frame is not None:
+        frame.record["rows_out"] = (frame.record["rows_out"] or 0) + n_rows
+
+
+@contextmanager
+def outside_panels():
+    """Run the `with` block as if no panel was running: rows it reports count nowhere."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class _Frame:
+    """A running panel: its record, plus the highest traced memory seen in it so far."""
+
+    def __init__(self, record, trace_peak=True):
+        self.record = record
+        self.trace_peak = trace_peak
+        self.peak = 0
+
+
+@contextmanager
+def panel(page, name, rows_in=None, trace_peak=None):
+    """Measure one panel of a page: the code run inside the `with` block.
+
+    The record sent to every listener (and to `collect`) holds the page, the
+    panel name, the wall time in seconds, the rows the panel read (`rows_in`)
+    and produced (see `add_rows_out`), how much the resident memory grew, and,
+    while tracemalloc is tracing (PYTHONTRACEMALLOC=1, or benchmark.py), the
+    peak memory allocated during the panel (otherwise None).
+
+    Panels nest: a panel given no `page` or `rows_in` takes its enclosing
+    panel's. Nothing is measured unless something listens.
+
+    tracemalloc has one peak for the whole process, which every panel resets:
+    panels running alongside others (see panel_pool) pass `trace_peak=False`
+    and report no peak, and so do the panels nested in them.
+    """
+    collected = _collected.get()
+    if not _listeners and collected is None:
+        yield
+        return
+
+    parent = _current.get()
+    record = {
+        "page": page if page is not None or parent is None else parent.record["page"],
+        "panel": name,
+        "seconds": None,
+        "rows_in": rows_in if rows_in is not None or parent is None else parent.record["rows_in"],
+        "rows_out": None,
+        "rss_bytes": None,
+        "peak_bytes": None,
+    }
+    if trace_peak is None:
+        trace_peak = parent is None or parent.trace_peak
+    frame = _Frame(record, trace_peak)
+    token = _current.set(frame)
+
+    tracing = trace_peak and tracemalloc.is_tracing()
+    if tracing:
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        # The enclosing panel keeps the peak it reached so far, since it is reset here
+        if parent is not None:
+            parent.peak = max(parent.peak, peak_memory)
+        tracemalloc.reset_peak()
+        start_memory = current_memory
+    start_rss = rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        end_rss = rss_bytes()
+        if start_rss is not None and end_rss is not None:
+            record["rss_bytes"] = end_rss - start_rss
+        if tracing and tracemalloc.is_tracing():
+            frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            record["peak_bytes"] = frame.peak - start_memory
+            if parent is not None:
+                parent.peak = max(parent.peak, frame.peak)
+        _current.reset(token)
+
+        if collected is not None:
+            collected.append(record)
+        with _lock:
+            listeners = list(_listeners)
+        for listener in listeners:
+            listener(record)
+
+
+def show_timings(records):
+    """Debug sidebar: the panel records of this rerun, slowest first."""
+    if not records:
+        return
+    timings = pd.DataFrame(records)
+    timings = pd.DataFrame({
+        "page": timings["page"],
+        "panel": timings["panel"],
+        "ms": timings["seconds"] * 1000,
+        "rows in": timings["rows_in"].astype("Int64"),
+        "rows out": timings["rows_out"].astype("Int64"),
+        "RSS MB": timings["rss_bytes"].astype(float) / 2**20,
+        "peak MB": timings["peak_bytes"].astype(float) / 2**20,
+    }).sort_values("ms", ascending=False, kind="stable")
+    if timings["peak MB"].isna().all():
+        timings = timings.drop(columns="peak MB")
+
+    st.sidebar.subheader("Timings")
+    st.sidebar.dataframe(timings, hide_index=True, column_config={
+        "ms": st.column_config.NumberColumn(format="%.1f"),
+        "RSS MB": st.column_config.NumberColumn(format="%.1f"),
+        "peak MB": st.column_config.NumberColumn(format="%.1f"),
+    })
+
+
+if METRICS_LOG:
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+    add_listener(log_record)
@@ -0,0 +1,94 @@
+import sys
+
+import pandas as pd
+import streamlit as st
+from streamlit import runtime
+
+from charts import CHART_BACKEND, get_chart_cache
+from instrument import rss_bytes
+from sales_data import get_store, load_data, prepare_data
+from sales_index import get_index
+
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def active_sessions():
+    """Number of sessions connected to this server, or None where Streamlit does not tell."""
+    try:
+        return runtime.get_instance()._session_mgr.num_active_sessions()
+    except (AttributeError, RuntimeError):
+        return None
+
+
+def session_state_bytes():
+    """Approximate size of what this session keeps in st.session_state."""
+    return sum(
+        frame_bytes(value) if isinstance(value, pd.DataFrame) else sys.getsizeof(value)
+        for value in st.session_state.to_dict().values()
+    )
+
+
+def memory_report(df):
+    """What the Sales data behind `df` (the frame a page works on) costs, as a frame.
+
+    "shared" rows are held once per process whatever the number of sessions;
+    "per session" rows are what every session adds on top of them.
+    """
+    store = get_store()
+    loaded = load_data()
+
+    rows = []
+    if store.table is not None:
+        rows.append(("Sales working set (Arrow)", "shared", store.table.nbytes))
+    rows.append(("Loaded frame", "shared", frame_bytes(loaded)))
+    if df is not loaded:
+        rows.append(("Filtered frame", "shared", frame_bytes(df)))
+    rows += [
+        ("Prepared frame", "shared", frame_bytes(prepare_data(df).df)),
+        ("Bitmap index", "shared", get_index(df).nbytes),
+        ("Chart cache", "shared", get_chart_cache().nbytes),
+        ("Session state", "per session", session_state_bytes()),
+    ]
+
+    # Whatever the process holds beyond the shared data, spread over the sessions:
+    # an upper bound on the per-session overhead (it includes Python and its libraries)
+    rss, sessions = rss_bytes(), active_sessions()
+    if rss is not None and sessions:
+        shared = sum(nbytes for _, scope, nbytes in rows if scope == "shared")
+        rows.append(("Rest of the process / sessions", "per session", max(rss - shared, 0) // sessions))
+
+    report = pd.DataFrame(rows, columns=["memory", "scope", "bytes"])
+    report.attrs.update(rss_bytes=rss, sessions=sessions)
+    return report
+
+
+def show_memory_report(df):
+    """Debug sidebar: the memory report of `df` (see memory_report)."""
+    report = memory_report(df)
+    rss, sessions = report.attrs["rss_bytes"], report.attrs["sessions"]
+
+    st.sidebar.subheader("Memory")
+    st.sidebar.dataframe(
+        report.assign(MB=report["bytes"] / 2**20).drop(columns="bytes"),
+        hide_index=True,
+        column_config={"MB": st.column_config.NumberColumn(format="%.1f")},
+    )
+    resident = f"{rss / 2**20:,.0f} MB resident" if rss is not None else "resident memory unknown"
+    connected = f", {sessions} session(s) connected" if sessions else ""
+    st.sidebar.caption(f"Process: {resident}{connected}")
+
+    # Figures only exist when charts are drawn on the server
+    if CHART_BACKEND == "matplotlib":
+        show_figure_stats()
+
+
+def show_figure_stats():
+    """Debug sidebar: the matplotlib figures this process created and released (see figures.FigureTracker)."""
+    from figures import figure_stats
+
+    stats = figure_stats()
+    st.sidebar.subheader("Figures")
+    st.sidebar.caption(f"{stats['live']} live, {stats['created']} created, {stats['released']} released")
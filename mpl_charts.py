@@ -0,0 +1,223 @@
+import textwrap
+from functools import partial
+
+import seaborn as sns
+
+from figures import new_figure
+
+
+# Matplotlib drawers of the dashboard charts: aggregated data in (see charts.py),
+# figure out. Each chart draws on a figure of its own, rendered on the server.
+
+def wrap_labels(labels, width):
+    return ['\n'.join(textwrap.wrap(label, width)) for label in labels]
+
+
+def rotate_xticklabels(ax, rotation=45, ha='right', **kwargs):
+    # What plt.xticks(rotation=..., ha=...) does, without going through pyplot
+    for label in ax.get_xticklabels():
+        label.set(rotation=rotation, ha=ha, **kwargs)
+
+
+def plot_category_counts(data):
+    # Create the plot
+    fig = new_figure(figsize=(8, 5))
+    ax = sns.barplot(x='Product Category', y='Count', data=data, color='skyblue', ax=fig.subplots())
+    ax.set_xlabel('Product Category', labelpad=20)
+    ax.set_ylabel("Number of Products")
+    ax.set_title('Individual Distribution of Product Categories', pad=15)
+    wrapped_labels = [textwrap.fill(label, width=10) for label in data['Product Category']]
+    ax.set_xticklabels(wrapped_labels, rotation=0)  # Keep them horizontal
+
+    # Adjusting space above the highest bar
+    ax.set_ylim(0, max(data['Count']) * 1.2)
+
+    # Add number and percentage labels to the bars
+    for p, percentage in zip(ax.patches, data['Percentage']):
+        count = int(p.get_height())
+        count_label = f'{count:,}'  # Format count with commas
+        percentage_label = f'{percentage:.1f}%'
+        # Annotate percentage above the bar
+        ax.annotate(percentage_label, (p.get_x() + p.get_width() / 2., p.get_height()),
+                    ha='center', va='bottom', xytext=(2, 16), textcoords='offset points', weight='bold', fontsize=10)
+        # Annotate count directly under the percentage label
+        ax.annotate(count_label, (p.get_x() + p.get_width() / 2., p.get_height()),
+                    ha='center', va='bottom', xytext=(2, 1), textcoords='offset points', fontsize=8.5)
+
+    return fig
+
+
+def plot_qty_by(data, column, label, figsize=(9, 6), wrap=False):
+    # Create the plot
+    fig = new_figure(figsize=figsize)
+    ax = sns.barplot(x=column, y='Qty Sold', data=data, palette='viridis', hue=column, dodge=False, ax=fig.subplots())
+
+    ax.set_xlabel(label, labelpad=20)
+    ax.set_ylabel("Total Quantity Sold")
+    ax.set_title(f"Total Quantity Sold by {label}", pad=15)
+    if wrap:
+        # Wrap the text labels
+        wrapped_labels = [textwrap.fill(name, width=10) for name in data[column].unique()]
+        ax.set_xticklabels(wrapped_labels, rotation=0)  # Keep them horizontal
+
+    # Adding more space above the highest bar for better readability
+    ax.set_ylim(0, max(data['Qty Sold']) * 1.2)
+
+    # Add number and percentage labels to the bars
+    for p in ax.patches:
+        count = int(p.get_height())
+        # Find the corresponding percentage
+        percentage = data.loc[data['Qty Sold'] == count, 'Percentage'].values[0]
+        count_label = f'{count:,}'  # Format count with commas
+        percentage_label = f'{percentage:.1f}%'
+
+        # Annotate percentage below the total quantity sold label
+        ax.annotate(percentage_label, (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='bottom',
+                    xytext=(0, 15), textcoords='offset points', color='green', weight="bold")
+
+        # Annotate total quantity sold above the bar
+        ax.annotate(count_label, (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='bottom',
+                    xytext=(0, 0), textcoords='offset points', fontsize=8.5)
+
+    return fig
+
+
+def plot_top_products(data):
+    data = data.assign(**{'Product Name': wrap_labels(data['Product Name'], 60)})
+
+    # Set the plot size
+    fig = new_figure(figsize=(7, 8))
+
+    # Create a horizontal bar plot using the top 10 products data
+    ax = sns.barplot(x='Qty Sold', y='Product Name', data=data, color='skyblue', dodge=False, ax=fig.subplots())
+
+    # Add title and labels
+    ax.set_title('Top 10 Products by Quantity Sold', fontsize=12, pad=15)
+    ax.set_xlabel('Quantity Sold', fontsize=12, labelpad=20)
+    ax.set_ylabel('Product Name', fontsize=12)
+
+    # Annotate the bars with the count inside the bar
+    for p in ax.patches:
+        width = p.get_width()  # The width of the bar (Qty Sold)
+        ax.annotate(f'{int(width):,}',  # Formatting the count with commas
+                    (width - width * 0.02, p.get_y() + p.get_height() / 2),  # Position slightly inside the bar
+                    ha='right', va='center', color='white', fontsize=10, weight='bold')  # Adjust label position and style
+
+    # Reduce the font size of y-axis (product names)
+    ax.tick_params(axis='y', labelsize=8)
+
+    # Increase left margin to avoid cutting off long product names
+    fig.subplots_adjust(left=0.4)
+
+    return fig
+
+
+def plot_high_sales_products(data):
+    data = data.assign(**{'Product Name': wrap_labels(data['Product Name'], 60)})
+
+    fig = new_figure(figsize=(7, 8))
+    ax = fig.subplots()
+    sns.barplot(x='Qty Sold', y='Product Name', data=data, ax=ax, color='#0c424e')
+    ax.set_title("Top 10 Products with Potential High Sales")
+    ax.set_xlabel("Total Quantity Sold")
+    ax.set_ylabel("Product Name")
+    rotate_xticklabels(ax)
+
+    # Annotate each bar with quantity sold
+    for p in ax.patches:
+        width = p.get_width()
+        ax.annotate(f'{int(width):,}', (width - width * 0.02, p.get_y() + p.get_height() / 2),
+                    ha='right', va='center', color='white', fontsize=10, weight='bold')
+
+    ax.tick_params(axis='y', labelsize=8)
+
+    return fig
+
+
+def plot_growth_3_months(data):
+    plot_data = data.sort_values(by=['Product Name', 'Month'])
+    plot_data = plot_data.sort_values(by='Qty Sold', ascending=True)
+    plot_data['Product Name'] = wrap_labels(plot_data['Product Name'], 40)
+
+    # Plotting the month-on-month growth
+    fig = new_figure(figsize=(10, 8))
+    ax = fig.subplots()
+    sns.barplot(data=plot_data, x='Qty Sold', y='Product Name', hue='Month', ax=ax)
+    ax.set_title("Month-on-Month Positive Growth (3 Months)", pad=15)
+    ax.set_xlabel("Total Quantity Sold", labelpad=20)
+    ax.set_ylabel("Product Name")
+
+    # Adjust axis settings
+    rotate_xticklabels(ax, fontsize=12)
+    fig.tight_layout()
+
+    # Add space above the bars
+    max_value = plot_data['Qty Sold'].dropna().max()
+    ax.set_xlim(0, max_value * 1.2)
+
+    # Annotate bars
+    for p in ax.patches:
+        width = p.get_width()
+        ax.annotate(f'{int(width):,}',
+                    (width + 5, p.get_y() + p.get_height() / 2),
+                    ha='left', va='center', color='black', fontsize=10)
+
+    ax.tick_params(axis='y', labelsize=12)
+
+    return fig
+
+
+def plot_growth_2_months(data):
+    # Wrap long product names for readability
+    data = data.assign(**{'Product Name': wrap_labels(data['Product Name'], 60)})
+
+    fig = new_figure(figsize=(14, 12))
+    ax = fig.subplots()
+
+    # Create a bar plot with the melted data, differentiated by month (using hue)
+    sns.barplot(x="Qty Sold", y="Product Name", hue="Month", data=data, ax=ax, palette="muted")
+
+    # Adding more space above the highest bar for better readability
+    max_value = data['Qty Sold'].max()  # Find the maximum value in the data
+    ax.set_xlim(0, max_value * 1.2)  # Adjust x-axis limit to add extra space above the highest bar
+
+    # Annotate bars with values (the quantity sold)
+    for p in ax.patches:
+        width = p.get_width()
+        if width < 0:  # Avoid negative values if present
+            width = 0
+
+        # Adjust annotation position: Ensure it stays inside the bars
+        ax.annotate(f'{int(width):,}',
+                    (width + 5, p.get_y() + p.get_height() / 2),  # Position slightly inside the bar
+                    ha='left', va='center', color='black', fontsize=12)
+
+    # Set titles and labels with larger font size
+    ax.set_title("+ve GROWTH for Current vs Last Month (2 Months)", fontsize=16, pad=15)
+    ax.set_xlabel("Quantity Sold", fontsize=14)
+    ax.set_ylabel("Product Name", fontsize=14)
+
+    # Rotate x-axis labels for better readability and adjust size
+    rotate_xticklabels(ax, fontsize=12)
+
+    # Adjust y-axis labels' font size
+    ax.tick_params(axis='y', labelsize=12)
+
+    # Adjust layout to prevent clipping of labels
+    fig.tight_layout()
+
+    return fig
+
+
+
+# Chart id -> drawing function
+MATPLOTLIB_CHARTS = {
+    'category_counts': plot_category_counts,
+    'category_sales': partial(plot_qty_by, column='Product Category', label='Product Category', figsize=(8, 5), wrap=True),
+    'rating_category_sales': partial(plot_qty_by, column='Rating_cat', label='Rating Category'),
+    'price_category_sales': partial(plot_qty_by, column='Price_cat', label='Price Category'),
+    'top_10_products': plot_top_products,
+    'high_sales_top_10': plot_high_sales_products,
+    'growth_3_months': plot_growth_3_months,
+    'growth_2_months': plot_growth_2_months,
+}
@@ -0,0 +1,99 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from instrument import add_rows_out, outside_panels, panel
+
+
+# Threads computing panels, shared by every session. 1 computes every panel in
+# place, one after the other, which is the default on a single core: there,
+# threads only add switching.
+_CPUS = os.cpu_count() or 1
+PANEL_WORKERS = int(os.environ.get("SELLERWAVE_PANEL_WORKERS", min(4, _CPUS) if _CPUS > 1 else 1))
+
+
+
+@st.cache_resource
+def get_panel_pool(workers):
+    """Return the process-wide pool of `workers` panel threads."""
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="panel")
+
+
+def compute_panel(script_ctx, page, name, compute):
+    """Run `compute()` as panel `name` of `page`, in a pool thread working for the script run `script_ctx`.
+
+    The rows of a DataFrame result count as the panel's rows out, as they would if it were drawn here.
+    No peak memory is traced: other panels run at the same time (see instrument.panel).
+    """
+    thread = threading.current_thread()
+    if script_ctx is not None:
+        # Cached functions called by `compute` need to know which session they serve
+        add_script_run_ctx(thread, script_ctx)
+    try:
+        with panel(page, name, trace_peak=False):
+            result = compute()
+            if isinstance(result, pd.DataFrame):
+                add_rows_out(len(result))
+        return result
+    finally:
+        if script_ctx is not None:
+            add_script_run_ctx(thread, None)
+
+
+class PanelBatch:
+    """Panels of a page computed concurrently, each drawn in its own slot as soon as it is ready.
+
+        with PanelBatch('stories') as panels:
+            st.markdown(...)                        # drawn right away
+            panels.add('care_products', compute, draw)
+
+    `add` reserves the panel's place on the page (an st.empty slot) and submits
+    `compute()` to the panel pool. `compute` must not draw anything: it returns
+    the panel's data, which `draw(result)` then draws into the slot, from the
+    script thread, in the order panels finish. The page is complete after the
+    slowest panel rather than after the sum of all of them.
+    """
+
+    def __init__(self, page, workers=None):
+        self.page = page
+        self.workers = workers or PANEL_WORKERS
+        self.pending = {}
+
+    def add(self, name, compute, draw):
+        if self.workers <= 1:
+            with panel(self.page, name):
+                draw(compute())
+            return
+
+        slot = st.empty()
+        # Each panel runs in a copy of the script's context, so instrument records
+        # still nest under the page and reach this rerun's collector
+        context = contextvars.copy_context()
+        future = get_panel_pool(self.workers).submit(
+            context.run, compute_panel, get_script_run_ctx(), self.page, name, compute
+        )
+        self.pending[future] = (slot, draw)
+
+    def draw_ready(self):
+        """Draw every submitted panel as it finishes."""
+        for future in as_completed(self.pending):
+            slot, draw = self.pending[future]
+            # Rows were counted by compute_panel already
+            with slot.container(), outside_panels():
+                draw(future.result())
+        self.pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.draw_ready()
+        else:
+            for future in self.pending:
+                future.cancel()
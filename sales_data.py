@@ -0,0 +1,522 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+from instrument import write_metrics
+from sources import SOURCE, get_source
+
+
+logger = logging.getLogger(__name__)
+
+# Pages work on views of the shared, process-wide frames. With Copy-on-Write
+# (always on from pandas 3) anything derived from them is copied only if it is
+# modified, and the shared frames themselves never change.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# Columns the pages actually use (everything else in the table is never downloaded)
+SALES_COLUMNS = [
+    "coll_date",
+    "Month",
+    "Product Name",
+    "Product Category",
+    "Qty Sold",
+    "Price",
+    "Price_cat",
+    "Rating_cat",
+]
+
+# Text columns held as pandas categoricals (one small integer code per row)
+CATEGORY_COLUMNS = ["Month", "Product Name", "Product Category", "Price_cat", "Rating_cat"]
+
+# Column used as the high-water mark for incremental syncs
+WATERMARK_COLUMN = "coll_date"
+
+# How long (seconds) a loaded dataset is served before it is refreshed in the background
+CACHE_TTL = 600
+
+# How often (seconds) the background refresh asks the source whether the table changed
+POLL_INTERVAL = 60
+
+# Datasets every per-dataset cache holds at once: the loaded frame plus one per
+# sidebar filter selection in use across sessions (see filters.apply_filters)
+MAX_DATASETS = int(os.environ.get("SELLERWAVE_MAX_DATASETS", 16))
+
+# Local snapshot of the working set (an Arrow IPC file), reused across server
+# restarts. Each source keeps its own, so switching sources never mixes their rows.
+SNAPSHOT_PATH = os.environ.get(
+    "SELLERWAVE_SNAPSHOT",
+    os.path.join(".cache", "sales.arrow" if SOURCE == "bigquery" else f"sales-{SOURCE}.arrow"),
+)
+
+# Set SELLERWAVE_OFFLINE=1 to serve the snapshot only and never query the source
+OFFLINE = os.environ.get("SELLERWAVE_OFFLINE") == "1"
+
+# "raw" loads every collected row; "monthly" lets the source roll the table up to
+# one row per product and month (see MONTHLY_QUERY) before anything is downloaded
+DATA_MODE = os.environ.get("SELLERWAVE_DATA_MODE", "raw")
+
+
+# Monthly per-product rollup, same columns as the raw table. "First" values are
+# taken from the earliest collected row of the month, like groupby().first() on
+# the date-sorted frame. Written in BigQuery syntax; every source runs it.
+MONTHLY_QUERY = """
+SELECT
+    MIN(coll_date) AS coll_date,
+    `Month`,
+    `Product Name`,
+    MIN_BY(`Product Category`, coll_date) AS `Product Category`,
+    SUM(`Qty Sold`) AS `Qty Sold`,
+    MIN_BY(`Price`, coll_date) AS `Price`,
+    MIN_BY(`Price_cat`, coll_date) AS `Price_cat`,
+    MIN_BY(`Rating_cat`, coll_date) AS `Rating_cat`
+FROM {table}
+GROUP BY `Product Name`, `Month`
+"""
+
+
+
+def encode_text(table):
+    """Dictionary-encode the text columns of `table`, so each row holds a small integer, not a string."""
+    for column in CATEGORY_COLUMNS:
+        if column in table.column_names and not pa.types.is_dictionary(table.schema.field(column).type):
+            table = table.set_column(table.column_names.index(column), column, pc.dictionary_encode(table[column]))
+    return table
+
+
+def decode_text(table):
+    """`table` with its dictionary-encoded columns back to plain values."""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, pc.cast(table[i], field.type.value_type))
+    return table
+
+
+def same_rows(a, b):
+    """Whether Arrow tables `a` and `b` hold the same rows, in any order."""
+    if a.num_rows != b.num_rows or set(a.column_names) != set(b.column_names):
+        return False
+    a, b = decode_text(a), decode_text(b.select(a.column_names))
+    if a.schema != b.schema:
+        return False
+    keys = [(column, "ascending") for column in a.column_names]
+    return a.sort_by(keys).equals(b.sort_by(keys))
+
+
+def to_pandas(table, products=None):
+    """Convert an Arrow table to a pandas frame with the compact Sales dtypes.
+
+    Text columns become categoricals straight from Arrow dictionaries, and the
+    numbers are downcast. When `products` is given, Product Name codes are its
+    positions, so every product keeps the same code across refreshes.
+    """
+    categories = [column for column in CATEGORY_COLUMNS if column in table.column_names]
+
+    if products is None or "Product Name" not in table.column_names:
+        df = table.to_pandas(split_blocks=True, date_as_object=False, categories=categories)
+    else:
+        df = table.drop_columns(["Product Name"]).to_pandas(split_blocks=True, date_as_object=False, categories=categories)
+        codes = pc.fill_null(pc.index_in(table["Product Name"], value_set=products), -1)
+        df.insert(
+            table.column_names.index("Product Name"),
+            "Product Name",
+            pd.Categorical.from_codes(codes.to_numpy(), categories=products.to_pandas()),
+        )
+
+    if "Qty Sold" in df:
+        df["Qty Sold"] = pd.to_numeric(df["Qty Sold"], downcast="integer")
+    if "Price" in df:
+        df["Price"] = pd.to_numeric(df["Price"], downcast="float")
+    return df
+
+
+
+def to_frame(table, stats, products=None):
+    """to_pandas, adding the conversion time and the size of the frame to `stats`."""
+    start = time.perf_counter()
+    df = to_pandas(table, products)
+    stats.update(
+        conversion_seconds=time.perf_counter() - start,
+        rows=len(df),
+        frame_bytes=int(df.memory_usage(deep=True).sum()),
+    )
+    return df
+
+
+
+class SalesStore:
+    """Local working set of the Sales table, kept up to date by a watermark on coll_date.
+
+    The first sync reads the whole table; every later sync only reads rows at or
+    after the highest coll_date already held, so a refresh costs the new data only.
+    The working set is persisted to SNAPSHOT_PATH, so a restarted server maps it
+    back from disk and can run without credentials at all. Its text columns are
+    dictionary-encoded (see encode_text), and it is shared by every session.
+    """
+
+    def __init__(self, snapshot_path=SNAPSHOT_PATH):
+        self.snapshot_path = snapshot_path
+        self.table = None
+        self.watermark = None
+        self.products = None
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def load_snapshot(self):
+        """Memory-map the on-disk snapshot as the working set, if there is one.
+
+        The snapshot is uncompressed, so the table's columns are the mapped file
+        itself: nothing is decoded or copied into the heap until pages use it.
+        """
+        if not os.path.exists(self.snapshot_path):
+            return False
+
+        self.table = encode_text(pa.ipc.open_file(pa.memory_map(self.snapshot_path)).read_all())
+        self.watermark = pc.max(self.table[WATERMARK_COLUMN]) if self.table.num_rows else None
+        self.intern_products(self.table)
+        self.version += 1
+        return True
+
+    def save_snapshot(self):
+        """Write the working set to disk (atomically, so readers never see a partial file)."""
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        tmp_path = self.snapshot_path + ".tmp"
+        # The IPC file format allows one dictionary per column, shared by every chunk
+        table = self.table.unify_dictionaries()
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def intern_products(self, rows):
+        """Append the product names of `rows` not seen before to the product dictionary."""
+        names = pc.unique(rows["Product Name"]).drop_null()
+        if pa.types.is_dictionary(names.type):
+            names = names.dictionary_decode()
+        if self.products is None:
+            self.products = names
+        else:
+            unseen = names.filter(pc.invert(pc.is_in(names, value_set=self.products)))
+            self.products = pa.concat_arrays([self.products, unseen])
+
+    def snapshot_age(self):
+        """Seconds since the snapshot was last written (infinite when there is none)."""
+        if not os.path.exists(self.snapshot_path):
+            return float("inf")
+        return time.time() - os.path.getmtime(self.snapshot_path)
+
+    def sync(self, stats=None):
+        """Fetch rows newer than the watermark, append them and return how many were read.
+
+        `version` only moves when the rows read differ from those held. Where the
+        rows came from and what reading them cost are added to `stats`.
+        """
+        stats = {} if stats is None else stats
+        with self._lock:
+            if self.table is None:
+                # Warm restart: a fresh snapshot is served as is, without querying the source
+                if self.load_snapshot() and self.snapshot_age() < CACHE_TTL:
+                    stats["source"] = "snapshot"
+                    return 0
+
+            source = get_source()
+            if OFFLINE or not source.available():
+                if self.table is None:
+                    raise FileNotFoundError(f"Running offline but no snapshot found at {self.snapshot_path}")
+                stats["source"] = "snapshot"
+                return 0
+
+            row_restriction = None
+            if self.watermark is not None:
+                # Re-read the watermark date itself so rows that land late for it are not lost
+                row_restriction = f"{WATERMARK_COLUMN} >= '{self.watermark.as_py()}'"
+
+            stats.update(source=source.name, incremental=row_restriction is not None)
+            new_rows = encode_text(source.read(SALES_COLUMNS, where=row_restriction, stats=stats))
+            stats["rows_read"] = new_rows.num_rows
+
+            if self.watermark is None:
+                changed = new_rows.num_rows > 0
+                self.table = new_rows
+            else:
+                # The watermark date is read again every time: only a difference with
+                # the rows held for it (or later ones) is a change
+                dates = self.table[WATERMARK_COLUMN]
+                changed = not same_rows(self.table.filter(pc.greater_equal(dates, self.watermark)), new_rows)
+                if changed:
+                    # Keep undated rows too: the row restriction never reads them again
+                    older_rows = self.table.filter(pc.or_kleene(pc.less(dates, self.watermark), pc.is_null(dates)))
+                    self.table = pa.concat_tables([older_rows, new_rows])
+            stats["changed"] = changed
+
+            if changed:
+                watermark = pc.max(self.table[WATERMARK_COLUMN])
+                self.watermark = watermark if watermark.is_valid else None
+                self.intern_products(new_rows)
+                self.version += 1
+
+            if changed or not os.path.exists(self.snapshot_path):
+                self.save_snapshot()
+            else:
+                # Nothing changed: just mark the snapshot as fresh
+                os.utime(self.snapshot_path)
+
+            return new_rows.num_rows
+
+
+@st.cache_resource
+def get_store():
+    """Return the process-wide Sales working set."""
+    return SalesStore()
+
+
+
+def read_sales(previous=None):
+    """Sync the Sales working set and return it as a DataFrame (`previous` if nothing changed)."""
+    stats = {"load": "sales"}
+    start = time.perf_counter()
+    store = get_store()
+    store.sync(stats)
+    stats["sync_seconds"] = time.perf_counter() - start
+
+    stamp = f"sales-v{store.version}"
+    if previous is not None and previous.attrs.get("fingerprint") == stamp:
+        return previous
+
+    df = issue_frame(to_frame(store.table, stats, store.products), stamp)
+    write_metrics("load", **stats)
+    return df
+
+
+def source_last_modified():
+    """When the source table last changed, or None when it is not queried (offline, no credentials)."""
+    source = get_source()
+    if OFFLINE or not source.available():
+        return None
+    return source.last_modified()
+
+
+class Refresher:
+    """Serves the latest result of `load(previous)`, kept fresh by a background thread.
+
+    Stale-while-revalidate: only the first `get` (the warm-up) waits for `load`.
+    Then a daemon thread reloads every `interval` seconds, or as soon as
+    `changed()` returns something new (the table's last modification time), and
+    swaps the new value in at once. Until then every session keeps getting the
+    previous value, and a failed refresh keeps it too.
+    """
+
+    def __init__(self, name, load, spinner=None, changed=source_last_modified,
+                 interval=CACHE_TTL, poll_interval=POLL_INTERVAL):
+        self.name = name
+        self.load = load
+        self.spinner = spinner
+        self.changed = changed
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self.value = None
+        self.loaded_at = None
+        self.marker = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def get(self):
+        """Return the current value; only the warm-up ever waits for a load."""
+        if self.value is None:
+            with self._lock, st.spinner(self.spinner or f"Loading {self.name}..."):
+                if self.value is None:
+                    self._reload()
+            self.start()
+        return self.value
+
+    def refresh(self):
+        """Load a new value and swap it in (loads never run concurrently)."""
+        with self._lock:
+            self._reload()
+
+    def _reload(self):
+        value = self.load(self.value)
+        self.value, self.loaded_at = value, time.monotonic()
+
+    def start(self):
+        """Start the background thread (it only holds a weak reference, see refresh_loop)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=refresh_loop, args=(weakref.ref(self),), name=f"refresh-{self.name}", daemon=True
+                )
+                self._thread.start()
+
+    def poll(self):
+        """Refresh when the value is older than `interval` or the source changed."""
+        try:
+            # Read the marker before loading, so a change landing during the load triggers another
+            marker = self.changed() if self.changed is not None else None
+            if self.marker is None:
+                self.marker = marker
+            if marker != self.marker or time.monotonic() - self.loaded_at >= self.interval:
+                self.refresh()
+                self.marker = marker
+        except Exception:
+            logger.exception("Refreshing %s failed, still serving the previous data", self.name)
+
+
+def refresh_loop(ref):
+    """Background thread of a Refresher: poll it until it is dropped (e.g. by a cache clear)."""
+    while True:
+        refresher = ref()
+        if refresher is None:
+            return
+        poll_interval = refresher.poll_interval
+        del refresher
+        time.sleep(poll_interval)
+
+        refresher = ref()
+        if refresher is None:
+            return
+        refresher.poll()
+        del refresher
+
+
+@st.cache_resource
+def get_sales_refresher():
+    """Return the process-wide refresher of the Sales frame."""
+    return Refresher("sales", read_sales, spinner="Loading sales data...")
+
+
+def load_sales():
+    """Return the current Sales frame, refreshed in the background (see Refresher).
+
+    The frame is shared by every session (st.cache_resource hands out the object
+    itself, where st.cache_data would unpickle a copy per session and rerun):
+    read it, never modify it.
+    """
+    return get_sales_refresher().get()
+
+
+
+# Frames handed out by the app (see issue_frame), by id; entries go with their frame.
+# pandas copies attrs onto derived frames, so a fingerprint in attrs is only
+# trusted on the very frames registered here.
+_issued = weakref.WeakValueDictionary()
+
+
+def issue_frame(df, key):
+    """Give `df` the fingerprint `key` and trust it from now on; returns `df`.
+
+    Only for shared frames, which nothing modifies: the loaded datasets,
+    apply_filters results and PreparedSales frames.
+    """
+    df.attrs["fingerprint"] = key
+    _issued[id(df)] = df
+    return df
+
+
+def fingerprint(df):
+    """Return a key identifying the data in `df`, for per-dataset caches.
+
+    Frames issued by the app (see issue_frame) carry a cheap version stamp; any
+    other frame is hashed, even one derived from them that inherited the stamp.
+    """
+    if _issued.get(id(df)) is df:
+        return df.attrs["fingerprint"]
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+
+class PreparedSales:
+    """A Sales frame with coll_date parsed and rows sorted by date, plus its months in order.
+
+    `df` is shared by every panel and session using the same dataset: read it, never modify it.
+    """
+
+    def __init__(self, df, key):
+        # assign() leaves the caller's frame untouched
+        self.df = df.assign(coll_date=pd.to_datetime(df["coll_date"])).sort_values(by="coll_date", kind="stable")
+        # Same data as the caller's frame, so the same fingerprint, but rows in another
+        # order: caches holding row positions (sales_index) also key on row_order
+        issue_frame(self.df, key).attrs["row_order"] = "coll_date"
+
+        # All months, ordered by when they were first collected
+        self.months = self.df["Month"].drop_duplicates().tolist()
+        self.last_three_months = self.months[-3:]
+
+        if len(self.last_three_months) == 3:
+            self.third_last_month, self.last_month, self.current_month = self.last_three_months
+        elif len(self.last_three_months) == 2:
+            self.third_last_month = None
+            self.last_month, self.current_month = self.last_three_months
+        else:
+            self.third_last_month = None
+            self.last_month = self.current_month = self.last_three_months[0] if self.months else None
+
+
+@st.cache_resource(max_entries=MAX_DATASETS, show_spinner=False)
+def _cached_prepared(key, _df):
+    return PreparedSales(_df, key)
+
+
+def prepare_data(df):
+    """Return the PreparedSales of `df`, parsed and sorted once per dataset."""
+    return _cached_prepared(fingerprint(df), df)
+
+
+def rollup_monthly(df):
+    """Pandas equivalent of MONTHLY_QUERY, used when running from the local snapshot."""
+    df = df.sort_values(by="coll_date", kind="stable")
+    monthly = df.groupby(["Product Name", "Month"], as_index=False, sort=False, observed=True).agg(
+        **{
+            "coll_date": ("coll_date", "min"),
+            "Product Category": ("Product Category", "first"),
+            "Qty Sold": ("Qty Sold", "sum"),
+            "Price": ("Price", "first"),
+            "Price_cat": ("Price_cat", "first"),
+            "Rating_cat": ("Rating_cat", "first"),
+        }
+    )
+    return monthly[SALES_COLUMNS]
+
+
+def read_monthly_sales(previous=None):
+    """Return one row per product and month, aggregated by the source."""
+    source = get_source()
+    if OFFLINE or not source.available():
+        # Rolled up from the raw frame, so versioned by it
+        sales = load_sales()
+        stamp = f"{fingerprint(sales)}/monthly"
+        if previous is not None and previous.attrs.get("fingerprint") == stamp:
+            return previous
+
+        return issue_frame(rollup_monthly(sales), stamp)
+
+    stats = {"load": "monthly", "source": source.name}
+    df = to_frame(source.query(MONTHLY_QUERY, stats), stats)
+    issue_frame(df, fingerprint(df))
+    write_metrics("load", **stats)
+    return df
+
+
+@st.cache_resource
+def get_monthly_refresher():
+    """Return the process-wide refresher of the monthly rollup."""
+    return Refresher("monthly sales", read_monthly_sales, spinner="Loading monthly sales...")
+
+
+def load_monthly_sales():
+    """Return the current monthly rollup, shared and refreshed in the background like load_sales."""
+    return get_monthly_refresher().get()
+
+
+def load_data():
+    """Load the frame the pages work on, according to DATA_MODE."""
+    if DATA_MODE == "monthly":
+        return load_monthly_sales()
+    return load_sales()
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sales_data import MAX_DATASETS, fingerprint
+
+
+# Columns the pages filter on; every value of these gets a bitmap
+INDEX_COLUMNS = ["Month", "Product Category", "Price_cat", "Rating_cat"]
+
+
+
+class BitmapIndex:
+    """Packed bitmaps (one bit per row) of the rows holding each value of the indexed columns.
+
+    Filters are tuples of (column, value) pairs, where value may also be a tuple
+    of values (any of them matches). Any filter combination is then a few
+    bitwise ORs and ANDs over n_rows / 8 bytes, and the matching rows are taken
+    from the frame once, with no intermediate copies.
+    """
+
+    def __init__(self, df, columns=INDEX_COLUMNS):
+        self.n_rows = len(df)
+        self.bitmaps = {column: self.column_bitmaps(df[column]) for column in columns}
+        self._empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+
+    @staticmethod
+    def column_bitmaps(values):
+        """Value -> packed bitmap, for every value present in `values`."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, labels = pd.factorize(values)
+        used = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=len(labels)))
+        return {labels[code]: np.packbits(codes == code) for code in used}
+
+    def bitmap(self, filters):
+        """Packed bitmap of the rows matching every filter, or None when there are none."""
+        result = None
+        for column, value in filters:
+            values = value if isinstance(value, tuple) else (value,)
+            bitmaps = self.bitmaps[column]
+            matches = bitmaps.get(values[0], self._empty)
+            for one in values[1:]:
+                matches = matches | bitmaps.get(one, self._empty)
+            result = matches if result is None else result & matches
+        return result
+
+    def mask(self, filters):
+        """Boolean mask of the rows matching every filter (all True when there are none)."""
+        bitmap = self.bitmap(filters)
+        if bitmap is None:
+            return np.ones(self.n_rows, dtype=bool)
+        return np.unpackbits(bitmap, count=self.n_rows).view(bool)
+
+    def rows(self, filters):
+        """Positions of the rows matching every filter."""
+        return np.flatnonzero(self.mask(filters))
+
+    def take(self, df, filters):
+        """The rows of `df` (the frame this index was built from) matching every filter."""
+        if not filters:
+            return df
+        return df.take(self.rows(filters))
+
+    @property
+    def nbytes(self):
+        return sum(bitmap.nbytes for bitmaps in self.bitmaps.values() for bitmap in bitmaps.values())
+
+
+# Two per dataset: one per row order (the loaded frame's, and PreparedSales')
+@st.cache_resource(max_entries=2 * MAX_DATASETS, show_spinner=False)
+def _cached_index(key, row_order, _df):
+    return BitmapIndex(_df)
+
+
+def get_index(df):
+    """Return the BitmapIndex of `df`, built once per dataset and shared by every page and session.
+
+    Bitmaps hold row positions, so a dataset in another row order (see PreparedSales) gets its own.
+    """
+    return _cached_index(fingerprint(df), df.attrs.get("row_order"), df)
+
+
+def take_rows(df, filters):
+    """The rows of `df` matching `filters`, through its shared BitmapIndex."""
+    if not filters:
+        return df
+    return get_index(df).take(df, filters)
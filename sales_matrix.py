@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sales_data import MAX_DATASETS, fingerprint
+from sales_index import get_index
+
+
+
+class ProductMonthMatrix:
+    """Quantity sold per product and month, held as dense NumPy arrays.
+
+    Rows follow `products` (sorted, like the index of a pivot) and columns follow
+    `months` (ordered by first collection date). `rows` counts the collected rows
+    behind each cell, so "sold in a month" is simply `rows > 0`.
+    """
+
+    def __init__(self, products, months, qty, rows, first_price):
+        self.products = products
+        self.months = months
+        self.qty = qty
+        self.rows = rows
+        self.first_price = first_price
+        self._month_pos = {month: pos for pos, month in enumerate(months)}
+
+    def columns(self, months):
+        """Matrix column positions of `months`."""
+        return [self._month_pos[month] for month in months]
+
+    def sold_in_all(self, months):
+        """Boolean mask of the products sold in every one of `months`."""
+        return (self.rows[:, self.columns(months)] > 0).all(axis=1)
+
+    def to_frame(self, months, mask=None, price=False):
+        """Pivot-style frame: 'Product Name' and one quantity column per month.
+
+        Only products in `mask` with at least one row in `months` are kept, and
+        cells without rows are NaN, exactly like `result.pivot(...)` used to give.
+        """
+        cols = self.columns(months)
+        keep = self.rows[:, cols].sum(axis=1) > 0
+        if mask is not None:
+            keep &= mask
+
+        qty = self.qty[keep][:, cols]
+        present = self.rows[keep][:, cols] > 0
+
+        frame = pd.DataFrame({"Product Name": self.products[keep]})
+        for i, month in enumerate(months):
+            column = qty[:, i]
+            frame[month] = column if present[:, i].all() else np.where(present[:, i], column, np.nan)
+
+        if price:
+            # First price collected within the window (earliest month that has one)
+            prices = self.first_price[keep][:, cols]
+            first = np.argmax(~np.isnan(prices), axis=1) if len(prices) else np.empty(0, dtype=int)
+            frame["Price"] = prices[np.arange(len(prices)), first]
+
+        frame.columns.name = "Month"
+        return frame
+
+
+
+def factorize_sorted(values):
+    """Like pd.factorize(values, sort=True), but categoricals are sorted by label and never re-hashed."""
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return pd.factorize(values, sort=True)
+
+    codes = values.cat.codes.to_numpy()
+    used = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=len(values.cat.categories)))
+    labels = values.cat.categories[used]
+    order = labels.argsort()
+
+    # Map every used category code to the rank of its label
+    rank = np.full(len(values.cat.categories), -1, dtype=np.intp)
+    rank[used[order]] = np.arange(len(order))
+    return np.where(codes >= 0, rank[codes], -1), labels[order]
+
+
+def build_matrix(df, filters=()):
+    """Build the product x month matrix of `df`, counting only rows matching `filters`.
+
+    `filters` is a tuple of (column, value) pairs, matched through the shared
+    BitmapIndex of `df`. Products and months always come from the whole frame,
+    so matrices built with different filters line up.
+    """
+    dates = pd.to_datetime(df["coll_date"]).to_numpy()
+    order = np.argsort(dates, kind="stable")
+
+    months = pd.unique(df["Month"].to_numpy()[order]).tolist()
+    product_codes, products = factorize_sorted(df["Product Name"])
+    month_codes = pd.Index(months).get_indexer(df["Month"])
+
+    keep = product_codes >= 0
+    if filters:
+        keep &= get_index(df).mask(filters)
+
+    n_cells = len(products) * len(months)
+    shape = (len(products), len(months))
+    cells = product_codes * len(months) + month_codes
+
+    qty_sold = df["Qty Sold"].to_numpy()
+    qty = np.bincount(cells[keep], weights=np.nan_to_num(qty_sold[keep].astype(float)), minlength=n_cells)
+    if np.issubdtype(qty_sold.dtype, np.integer):
+        qty = qty.round().astype(np.int64)  # Qty Sold may be downcast; its sums are not
+    rows = np.bincount(cells[keep], minlength=n_cells)
+
+    # First price per cell, in collection date order
+    sorted_rows = order[keep[order]]
+    first_cells, first_pos = np.unique(cells[sorted_rows], return_index=True)
+    first_price = np.full(n_cells, np.nan)
+    first_price[first_cells] = df["Price"].to_numpy(dtype=float)[sorted_rows[first_pos]]
+
+    return ProductMonthMatrix(
+        products=np.asarray(products),
+        months=months,
+        qty=qty.reshape(shape),
+        rows=rows.reshape(shape),
+        first_price=first_price.reshape(shape),
+    )
+
+
+# The pages use three filter sets per dataset (see month_growth calls)
+@st.cache_resource(max_entries=3 * MAX_DATASETS, show_spinner=False)
+def _cached_matrix(key, filters, _df):
+    return build_matrix(_df, filters)
+
+
+def get_matrix(df, filters=()):
+    """Return the matrix of `df` for `filters`, built once per dataset and reused."""
+    return _cached_matrix(fingerprint(df), tuple(filters), df)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sales_data import MAX_DATASETS, fingerprint
+from sales_matrix import get_matrix
+
+
+
+def find_high_sales_products(data, window=3, threshold=1.1):
+    """Find products with potential high sales.
+
+    A product qualifies when its latest collected sale is above `threshold` times
+    the moving average of its last `window` sales. All products are handled in a
+    single pass: rows are sorted by product then date, and each product's
+    moving average comes out of one cumulative sum.
+    """
+    codes, products = pd.factorize(data['Product Name'], sort=True)
+    dates = pd.to_datetime(data['coll_date']).to_numpy().view('i8')
+    qty = data['Qty Sold'].to_numpy(dtype=float)
+
+    # Sort by product, then by collection date
+    order = np.lexsort((dates, codes))
+    order = order[codes[order] >= 0]
+    codes = codes[order]
+    qty = qty[order]
+    if len(codes) == 0:
+        return []
+
+    # Last row of every product, and how many rows it has
+    ends = np.flatnonzero(np.r_[codes[1:] != codes[:-1], True])
+    sizes = np.diff(np.r_[-1, ends])
+    enough = sizes >= window  # Ensure enough data points for moving average
+
+    # Sum (and missing count) of the last `window` rows of each product
+    cum_qty = np.r_[0.0, np.cumsum(np.nan_to_num(qty))]
+    cum_missing = np.r_[0, np.cumsum(np.isnan(qty))]
+    first = np.maximum(ends + 1 - window, 0)
+    moving_avg = (cum_qty[ends + 1] - cum_qty[first]) / window
+    complete = (cum_missing[ends + 1] - cum_missing[first]) == 0
+
+    high = enough & complete & (qty[ends] > threshold * moving_avg)
+    return products[codes[ends[high]]].tolist()
+
+
+
+@st.cache_data(max_entries=MAX_DATASETS, show_spinner=False)
+def _cached_high_sales_products(key, window, threshold, _df):
+    return find_high_sales_products(_df, window, threshold)
+
+
+def high_sales_products(df, window=3, threshold=1.1):
+    """Cached find_high_sales_products: computed once per dataset."""
+    return _cached_high_sales_products(fingerprint(df), window, threshold, df)
+
+
+
+# Which products a growth table keeps, given their quantities over the window
+# (one column per month, oldest first) and their growth over the window
+GROWTH_RULES = {
+    'any': lambda qty, growth: np.ones(len(growth), dtype=bool),
+    'positive': lambda qty, growth: growth > 0,
+    'negative': lambda qty, growth: growth < 0,
+    'monotonic': lambda qty, growth: (np.diff(qty, axis=1) > 0).all(axis=1),
+}
+
+
+def compute_month_growth(df, n_months, filters=(), rule='any', price=False):
+    """Quantities over the last `n_months` months and their growth, one row per product.
+
+    Products must have been sold (in any row) in each of those months. Quantities
+    and prices only count the rows matching the `filters` predicate, a tuple of
+    (column, value) pairs. Growth is the change from the first to the last month
+    of the window, in percent, and `rule` (a key of GROWTH_RULES) decides which
+    products are kept. Returns None when the data has fewer than `n_months` months.
+    """
+    all_sales = get_matrix(df)
+    if len(all_sales.months) < n_months:
+        return None
+    months = all_sales.months[-n_months:]
+
+    result = get_matrix(df, filters).to_frame(months, all_sales.sold_in_all(months), price=price)
+    qty = result[months].to_numpy(dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['Growth'] = (qty[:, -1] - qty[:, 0]) / qty[:, 0] * 100
+
+    keep = GROWTH_RULES[rule](qty, result['Growth'].to_numpy())
+    return result[keep].reset_index(drop=True)
+
+
+# The pages show seven different growth tables per dataset
+@st.cache_data(max_entries=8 * MAX_DATASETS, show_spinner=False)
+def _cached_month_growth(key, n_months, filters, rule, price, _df):
+    return compute_month_growth(_df, n_months, filters, rule, price)
+
+
+def month_growth(df, n_months, filters=(), rule='any', price=False):
+    """Cached compute_month_growth: each table is computed once per dataset."""
+    return _cached_month_growth(fingerprint(df), n_months, tuple(filters), rule, price, df)
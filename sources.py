@@ -0,0 +1,232 @@
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import streamlit as st
+
+# The Google clients and DuckDB are slow to import and only needed by the source
+# actually in use, so they are imported by the functions below
+
+
+# Where the loaders read Sales from: "bigquery" (the Sales table) or "duckdb"
+# (local Parquet files, no network or service account needed)
+SOURCE = os.environ.get("SELLERWAVE_SOURCE", "bigquery")
+
+# Table every page reads from
+TABLE_ID = "amaz-project-438116.Existing_data.Sales"
+
+# Parquet files holding the Sales table for the DuckDB source (a path or a glob)
+PARQUET_PATH = os.environ.get("SELLERWAVE_PARQUET", os.path.join("data", "sales", "*.parquet"))
+
+# Upper bound on the number of Storage Read API streams read in parallel
+MAX_READ_STREAMS = 4
+
+# Set SELLERWAVE_DRY_RUN=1 to have BigQuery estimate the bytes every query will
+# process (a free dry run) before running it
+DRY_RUN = os.environ.get("SELLERWAVE_DRY_RUN") == "1"
+
+
+
+def has_credentials():
+    """Return True when the BigQuery service account is configured in the secrets."""
+    try:
+        return "GOOGLE_CREDENTIAL_FOR_AMAZON" in st.secrets
+    except FileNotFoundError:
+        return False
+
+
+@st.cache_resource
+def get_credentials():
+    """Return the service account credentials stored in the Streamlit secrets."""
+    from google.oauth2 import service_account
+
+    credentials_info = st.secrets["GOOGLE_CREDENTIAL_FOR_AMAZON"]
+    return service_account.Credentials.from_service_account_info(credentials_info)
+
+
+@st.cache_resource
+def get_client():
+    """Return the process-wide BigQuery client (created once per server process)."""
+    from google.cloud import bigquery
+
+    credentials = get_credentials()
+
+    # Initialize BigQuery Client with correct credentials
+    return bigquery.Client(credentials=credentials, project=credentials.project_id)
+
+
+@st.cache_resource
+def get_read_client():
+    """Return the process-wide BigQuery Storage Read API client."""
+    from google.cloud import bigquery_storage
+
+    return bigquery_storage.BigQueryReadClient(credentials=get_credentials())
+
+
+
+def read_arrow(table, columns, row_restriction=None, stats=None):
+    """Read only `columns` of a BigQuery table as an Arrow table.
+
+    The rows are streamed as Arrow record batches through the Storage Read API,
+    one thread per read stream, so nothing goes through the JSON/row API. The
+    number of streams and the download time and size are added to `stats`.
+    """
+    start = time.perf_counter()
+    from google.cloud import bigquery
+    from google.cloud.bigquery_storage import types
+
+    table = bigquery.TableReference.from_string(str(table)) if isinstance(table, str) else table
+    read_client = get_read_client()
+
+    requested_session = types.ReadSession(
+        table=f"projects/{table.project}/datasets/{table.dataset_id}/tables/{table.table_id}",
+        data_format=types.DataFormat.ARROW,
+        read_options=types.ReadSession.TableReadOptions(
+            selected_fields=list(columns),
+            row_restriction=row_restriction or "",
+        ),
+    )
+    session = read_client.create_read_session(
+        parent=f"projects/{get_client().project}",
+        read_session=requested_session,
+        max_stream_count=MAX_READ_STREAMS,
+    )
+    schema = pa.ipc.read_schema(pa.py_buffer(session.arrow_schema.serialized_schema))
+
+    def read_stream(stream):
+        return [page.to_arrow() for page in read_client.read_rows(stream.name).rows(session).pages]
+
+    batches = []
+    if session.streams:
+        with ThreadPoolExecutor(max_workers=len(session.streams)) as pool:
+            for stream_batches in pool.map(read_stream, session.streams):
+                batches.extend(stream_batches)
+
+    # The Storage Read API returns columns in table order, not in requested order
+    result = pa.Table.from_batches(batches, schema=schema).select(list(columns))
+
+    if stats is not None:
+        stats.update(
+            streams=len(session.streams),
+            download_seconds=time.perf_counter() - start,
+            download_bytes=result.nbytes,
+        )
+    return result
+
+
+def job_stats(job):
+    """Cost and latency of a finished query job: where its time and money went."""
+    def seconds(start, end):
+        return (end - start).total_seconds() if start and end else None
+
+    return {
+        "job_id": job.job_id,
+        "bytes_processed": job.total_bytes_processed,
+        "bytes_billed": job.total_bytes_billed,
+        "slot_ms": job.slot_millis,
+        "cache_hit": job.cache_hit,
+        "queue_seconds": seconds(job.created, job.started),
+        "query_seconds": seconds(job.started, job.ended),
+    }
+
+
+
+class BigQuerySource:
+    """The Sales table in BigQuery.
+
+    Every source has the same interface: `read` fetches columns of the Sales
+    table, optionally filtered by a SQL condition, and `query` runs a SQL query
+    written in BigQuery syntax, with `{table}` standing for the Sales table.
+    Both return Arrow tables, and add what they measured to the `stats` dict
+    when given one. `last_modified` is a cheap way to tell whether the table
+    changed since it was read.
+    """
+
+    name = "bigquery"
+
+    def __init__(self, table_id=TABLE_ID):
+        self.table_id = table_id
+
+    def available(self):
+        """Return True when the source can be queried (here: credentials are configured)."""
+        return has_credentials()
+
+    def last_modified(self):
+        """When the table last changed (a metadata call, no query)."""
+        return get_client().get_table(self.table_id).modified
+
+    def read(self, columns, where=None, stats=None):
+        return read_arrow(self.table_id, columns, row_restriction=where, stats=stats)
+
+    def query(self, sql, stats=None):
+        from google.cloud import bigquery
+
+        sql = sql.format(table=f"`{self.table_id}`")
+        client = get_client()
+        stats = {} if stats is None else stats
+
+        if DRY_RUN:
+            dry_run = client.query(sql, job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False))
+            stats["estimated_bytes"] = dry_run.total_bytes_processed
+
+        job = client.query(sql)
+        rows = job.result()
+        stats.update(job_stats(job))
+        return read_arrow(job.destination, [field.name for field in rows.schema], stats=stats)
+
+
+class DuckDBSource:
+    """The Sales table as local Parquet files, queried in process by DuckDB.
+
+    Runs the same SQL as BigQuerySource, so the app works with no network or
+    service account, and heavy aggregations run on a fast local engine.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, path=PARQUET_PATH):
+        self.path = path
+
+    def available(self):
+        return bool(glob.glob(self.path))
+
+    def last_modified(self):
+        """Modification time of the newest Parquet file, or None when there is none."""
+        return max((os.path.getmtime(path) for path in glob.glob(self.path)), default=None)
+
+    def read(self, columns, where=None, stats=None):
+        sql = "SELECT " + ", ".join(f"`{column}`" for column in columns) + " FROM {table}"
+        if where:
+            sql += f" WHERE {where}"
+        return self.query(sql, stats)
+
+    def query(self, sql, stats=None):
+        import duckdb
+
+        # BigQuery quotes identifiers with backticks and DuckDB with double quotes
+        # (the queries run here never hold a backtick inside a string literal)
+        table = "read_parquet('{}')".format(self.path.replace("'", "''"))
+        sql = sql.replace("`", '"').format(table=table)
+
+        # One in-memory connection per query: nothing is shared between threads
+        start = time.perf_counter()
+        with duckdb.connect() as connection:
+            result = connection.execute(sql).fetch_record_batch().read_all()
+
+        if stats is not None:
+            stats.update(query_seconds=time.perf_counter() - start, download_bytes=result.nbytes)
+        return result
+
+
+# Source name -> class
+SOURCES = {source.name: source for source in (BigQuerySource, DuckDBSource)}
+
+
+@st.cache_resource
+def get_source():
+    """Return the process-wide Sales source selected by SELLERWAVE_SOURCE."""
+    if SOURCE not in SOURCES:
+        raise ValueError(f"Unknown SELLERWAVE_SOURCE {SOURCE!r}, expected one of {', '.join(SOURCES)}")
+    return SOURCES[SOURCE]()
@@ -1,61 +1,23 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import missingno as msno
-from collections import Counter 
-import re
-import numpy as np
-from google.cloud import bigquery
-from rich.console import Console
-from rich.text import Text
-import textwrap
-import os
-from google.oauth2 import service_account
-from google.auth import default
-import toml
+from panel_pool import PanelBatch
+from sales_data import prepare_data
+from sales_index import take_rows
+from sales_trends import month_growth
+from tables import number, show_table, table_style
 
 
+# Rows of $0-20 products
+CHEAP = (('Price_cat', '$0-20'),)
 
+# Rows of $0-20 Beauty & Personal Care products
+CARE_CHEAP = (('Product Category', 'Beauty & Personal Care'), ('Price_cat', '$0-20'))
 
-#Load credentials from TOML file
-credentials_info = st.secrets["GOOGLE_CREDENTIAL_FOR_AMAZON"]
 
-credentials = service_account.Credentials.from_service_account_info(credentials_info)
 
-# Initialize BigQuery Client with correct credentials
-client = bigquery.Client(credentials=credentials, project=credentials.project_id)
 
 
 
-# Define your SQL query to load data
-query = """
-SELECT *
-FROM `amaz-project-438116.Existing_data.Sales` 
-LIMIT 1000  -- You can adjust the limit as needed
-"""
 
-# Load data into a DataFrame
-df = client.query(query).to_dataframe()
-
-
-
-
-def prepare_data(df):
-    df['coll_date'] = pd.to_datetime(df['coll_date'])
-    df = df.sort_values(by='coll_date')
-    last_three_months = df['Month'].drop_duplicates().tail(3).tolist()
-
-    if len(last_three_months) == 3:
-        third_last_month, last_month, current_month = last_three_months
-    elif len(last_three_months) == 2:
-        third_last_month = None
-        last_month, current_month = last_three_months
-    else:
-        third_last_month = None
-        last_month = current_month = last_three_months[0]
-
-    return df, third_last_month, last_month, current_month, last_three_months
 
 
     
@@ -63,574 +25,307 @@ def prepare_data(df):
 
 def show_stories(df):
 
+    # Result table CSS, shared by every table on this page
+    table_style()
 
     st.markdown(
     "<h1 style='color:#7D4E57; font-size: 24px; font-style: italic;'>Sales Analysis</h1>", 
     unsafe_allow_html=True)
 
-    st.markdown(
-    "<h1 style='color:#BD7E58; font-size: 22px; font-weight: bold; font-style: italic;'> All Beauty & personal care products sold at <span style='color:#7D4E57;'>$0-20 <span style='color:#BD7E58;</h1>", 
-    unsafe_allow_html=True)
+    # Tables below are computed in the panel pool, each drawn into its place as soon
+    # as it is ready, so the page takes as long as its slowest table
+    with PanelBatch('stories') as panels:
+        st.markdown(
+        "<h1 style='color:#BD7E58; font-size: 22px; font-weight: bold; font-style: italic;'> All Beauty & personal care products sold at <span style='color:#7D4E57;'>$0-20 <span style='color:#BD7E58;</h1>", 
+        unsafe_allow_html=True)
 
 
-    # ALL BEAUTY & PERSONAL CARE PRODUCTS SOLD AT $0-20
-    
-    # Filter products from 'Beauty & Personal Care' category
-    care_product_df = df[df['Product Category'] == 'Beauty & Personal Care']
+        # ALL BEAUTY & PERSONAL CARE PRODUCTS SOLD AT $0-20
 
-    # Further filter products with price category $0-20
-    care_product_df = care_product_df[care_product_df['Price_cat'] == '$0-20']
+        def care_products():
+            # Filter products from 'Beauty & Personal Care' category, with price category $0-20
+            care_product_df = take_rows(df, CARE_CHEAP)
 
-    # Retain only the first price per product (assuming price remains the same)
-    price_mapping = care_product_df.groupby("Product Name")["Price"].first().reset_index()
+            # Retain only the first price per product (assuming price remains the same)
+            price_mapping = care_product_df.groupby("Product Name", observed=True)["Price"].first().reset_index()
     
-    # Group by Product Name and Price Category, summing the quantities sold
-    result = care_product_df.groupby(['Product Name', 'Price_cat'])['Qty Sold'].sum().reset_index()
+            # Group by Product Name and Price Category, summing the quantities sold
+            result = care_product_df.groupby(['Product Name', 'Price_cat'], observed=True)['Qty Sold'].sum().reset_index()
 
     
-    # Merge the price information
-    result = result.merge(price_mapping, on="Product Name", how="left")
-
-
-    # Select only relevant columns and reset index
-    result = result[['Product Name', "Price", 'Qty Sold']].sort_values(by='Qty Sold', ascending=False)
-    result.reset_index(drop=True, inplace=True)
-    result.index += 1  # Start numbering from 1
-
-    result["Qty Sold"] = result["Qty Sold"].apply(lambda x: f"{x:,.0f}")
-    result["Price"] = result["Price"].apply(lambda x: f"{x:,.2f}")
-
-     # Custom CSS to ensure product names wrap properly
-    st.markdown("""
-        <style>
-            div[data-testid="stTable"] table {
-                table-layout: fixed !important;
-                width: 100% !important;
-            }
-            div[data-testid="stTable"] th:nth-child(1),
-            div[data-testid="stTable"] td:nth-child(1) {
-                white-space: normal !important;
-                word-wrap: break-word !important;
-                max-width: 300px !important;
-            }
-            div[data-testid="stTable"] th:nth-child(2),
-            div[data-testid="stTable"] th:nth-child(3),
-            div[data-testid="stTable"] td:nth-child(2),
-            div[data-testid="stTable"] td:nth-child(3) {
-                text-align: right !important;
-                min-width: 100px !important;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-    # Reorder columns for better readability
-    result = result[['Product Name', 'Price', 'Qty Sold']]
-        
-    # Display the dataframe
-    st.write(result.to_html(escape=False, index=True), unsafe_allow_html=True)
-  
-   
-    
+            # Merge the price information
+            result = result.merge(price_mapping, on="Product Name", how="left")
 
 
+            # Select only relevant columns and reset index
+            result = result[['Product Name', "Price", 'Qty Sold']].sort_values(by='Qty Sold', ascending=False)
+            result.reset_index(drop=True, inplace=True)
+            result.index += 1  # Start numbering from 1
 
-    # ALL $0-20 PRODUCTS WITH 3 MONTHS CONSECUTIVE SALES
-
-    st.markdown(
-    "<h1 style='color:#BD7E58; font-size: 18px; font-weight: bold; font-style: italic;'>All <span style='color:#7D4E57;'>$0-20 <span style='color:#BD7E58;'>Products with </span> <span style='color:#7D4E57;'> 3 Months  </span><span style='color:#BD7E58;'>Consecutive sales</h1>", 
-    unsafe_allow_html=True)
-
+            # Reorder columns for better readability
+            return result[['Product Name', 'Price', 'Qty Sold']]
 
+        def draw_care_products(result):
+            # Display the dataframe, formatting the columns for better readability
+            show_table(result, {'Price': number(',.2f'), 'Qty Sold': number(',.0f')}, key='stories_care_products')
 
+        panels.add('care_products', care_products, draw_care_products)
+  
+   
     
-    # Prepare the data (using the function)
-    df, third_last_month, last_month, current_month, last_three_months = prepare_data(df)
 
-    # Check if 3 months are available
-    if len(last_three_months) >= 3:
-        
-
-         # FILTER ALL PRODUCTS SOLD IN THE LAST 3 MONTHS
-        products_sold_last_months = df[df['Month'].isin(last_three_months)]
 
-        # Find common products sold across the selected months (intersection of product names)
-        if third_last_month:
-            # If three months are available, find products sold in all three months
-            common_products = set(products_sold_last_months[products_sold_last_months['Month'] == current_month]['Product Name']).intersection(
-            set(products_sold_last_months[products_sold_last_months['Month'] == last_month]['Product Name']),
-            set(products_sold_last_months[products_sold_last_months['Month'] == third_last_month]['Product Name'])
-            )
-        
 
-        # Filter the DataFrame for these common products
-        common_products_df = products_sold_last_months[products_sold_last_months['Product Name'].isin(common_products)]
+        # ALL $0-20 PRODUCTS WITH 3 MONTHS CONSECUTIVE SALES
 
-        # Filter for Price_cat $0-20 only
-        common_products_df = common_products_df[common_products_df['Price_cat'] == '$0-20']
-
-                                                
-        # Group by Product Name, Price_cat, and Month, and sum the quantities sold
-        result = common_products_df.groupby(['Product Name', 'Price_cat', 'Month'])['Qty Sold'].sum().reset_index()
-
-        # Pivot the data to get separate columns for each month's quantity sold
-        pivot_result = result.pivot(index='Product Name', columns='Month', values='Qty Sold').reset_index()
+        st.markdown(
+        "<h1 style='color:#BD7E58; font-size: 18px; font-weight: bold; font-style: italic;'>All <span style='color:#7D4E57;'>$0-20 <span style='color:#BD7E58;'>Products with </span> <span style='color:#7D4E57;'> 3 Months  </span><span style='color:#BD7E58;'>Consecutive sales</h1>", 
+        unsafe_allow_html=True)
 
-        pivot_result.columns = pivot_result.columns.astype(str)
+        def consecutive_3_months():
+            # Prepare the data once: parsed and sorted by date, memoized per dataset
+            data = prepare_data(df)
 
-        # Calculate growth between the current month and third last month
-        
-        pivot_result['Growth'] = ((pivot_result[current_month] - pivot_result[third_last_month]) / pivot_result[third_last_month]) * 100
+            # $0-20 products sold in each of the last 3 months, with their growth
+            pivot_result = month_growth(data.df, 3, CHEAP)
 
-        # Filter for rows with positive growth
-        #pivot_result = pivot_result[pivot_result['Growth'] > 0]
+            # Check if 3 months are available
+            if pivot_result is None:
+                return None
 
-        pivot_result = pivot_result.fillna(0)
+            pivot_result.columns = pivot_result.columns.astype(str)
 
-        # Format the columns for better readability
-        pivot_result[last_month] = pivot_result[last_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result[current_month] = pivot_result[current_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result['Growth'] = pivot_result['Growth'].apply(lambda x: f"{x:,.0f}%")
+            pivot_result = pivot_result.fillna(0)
 
-        # Format the third last month if data is available
-        
-        pivot_result[third_last_month] = pivot_result[third_last_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result = pivot_result[['Product Name', third_last_month, last_month, current_month, 'Growth']]
+            pivot_result = pivot_result[['Product Name', data.third_last_month, data.last_month, data.current_month, 'Growth']]
         
         
-        # Reset index and start numbering from 1
-        pivot_result.reset_index(drop=True, inplace=True)
-        pivot_result.index += 1  # Start numbering from 1
-
-        # Custom CSS to ensure product names wrap properly
-        st.markdown("""
-        <style>
-            div[data-testid="stTable"] table {
-                table-layout: fixed !important;
-                width: 100% !important;
-            }
-            div[data-testid="stTable"] th:nth-child(1),
-            div[data-testid="stTable"] td:nth-child(1) {
-                white-space: normal !important;
-                word-wrap: break-word !important;
-                max-width: 300px !important;
-            }
-            div[data-testid="stTable"] th:nth-child(2),
-            div[data-testid="stTable"] th:nth-child(3),
-            div[data-testid="stTable"] td:nth-child(2),
-            div[data-testid="stTable"] td:nth-child(3) {
-                text-align: right !important;
-                min-width: 100px !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Display the dataframe
-        st.write(pivot_result.to_html(escape=False, index=True), unsafe_allow_html=True)
-    
-    else:
-        st.write("<h1 style='color:grey; font-size: 16px; font-weight: bold; font-style: italic;'>.....No sufficient data at the moment.</h1>", 
-        unsafe_allow_html=True)
-        
-
+            # Reset index and start numbering from 1
+            pivot_result.reset_index(drop=True, inplace=True)
+            pivot_result.index += 1  # Start numbering from 1
+            return pivot_result
 
-    # ALL $0-20 PRODUCTS WITH 2 MONTHS CONSECUTIVE SALES
+        def draw_consecutive_3_months(pivot_result):
+            if pivot_result is not None:
+                third_last_month, last_month, current_month = pivot_result.columns[1:4]
 
-    st.markdown(
-    "<h1 style='color:#BD7E58; font-size: 18px; font-weight: bold; font-style: italic;'>All <span style='color:#7D4E57;'>$0-20 <span style='color:#BD7E58;'>Products with </span> <span style='color:#7D4E57;'> 2 Months  </span><span style='color:#BD7E58;'>Consecutive sales</h1>", 
-    unsafe_allow_html=True
+                # Display the dataframe, formatting the columns for better readability
+                show_table(pivot_result, {
+                    third_last_month: number(',.0f'),
+                    last_month: number(',.0f'),
+                    current_month: number(',.0f'),
+                    'Growth': number(',.0f', '%'),
+                }, key='stories_consecutive_3_months')
     
-    )
+            else:
+                st.write("<h1 style='color:grey; font-size: 16px; font-weight: bold; font-style: italic;'>.....No sufficient data at the moment.</h1>", 
+                unsafe_allow_html=True)
 
+        panels.add('consecutive_3_months', consecutive_3_months, draw_consecutive_3_months)
+        
 
-    # Prepare the data (using the function)
-    df, third_last_month, last_month, current_month, last_three_months = prepare_data(df)
 
-    # Filter products sold in the last two months
-    products_sold_last_months = df[df['Month'].isin(last_three_months)]
+        # ALL $0-20 PRODUCTS WITH 2 MONTHS CONSECUTIVE SALES
 
-    # Find common products sold across the selected months (intersection of product names)
-    if last_month:
-        # If 2 months are available, find products sold in both months
-        common_products = set(products_sold_last_months[products_sold_last_months['Month'] == current_month]['Product Name']).intersection(
-            set(products_sold_last_months[products_sold_last_months['Month'] == last_month]['Product Name'])
+        st.markdown(
+        "<h1 style='color:#BD7E58; font-size: 18px; font-weight: bold; font-style: italic;'>All <span style='color:#7D4E57;'>$0-20 <span style='color:#BD7E58;'>Products with </span> <span style='color:#7D4E57;'> 2 Months  </span><span style='color:#BD7E58;'>Consecutive sales</h1>", 
+        unsafe_allow_html=True
+    
         )
 
-        # Filter the DataFrame for these common products
-        common_products_df = products_sold_last_months[products_sold_last_months['Product Name'].isin(common_products)]
-        
-        # Filter for Price_cat $0-20 only
-        common_products_df = common_products_df[common_products_df['Price_cat'] == '$0-20']
+        def consecutive_2_months():
+            data = prepare_data(df)
 
-        # Retain only the first price per product (assuming price remains the same)
-        price_mapping = common_products_df.groupby("Product Name")["Price"].first().reset_index()
+            # $0-20 products sold in both of the last 2 months, with the first price
+            # seen (assuming price remains the same) and their growth
+            pivot_result = month_growth(data.df, 2, CHEAP, price=True)
 
-        # Group by Product Name, Price_cat, and Month, summing the quantities sold
-        result = common_products_df.groupby(['Product Name', 'Price_cat', 'Month'])['Qty Sold'].sum().reset_index()
+            if pivot_result is None:
+                return None
 
-        # Pivot the data to get separate columns for each month's quantity sold
-        pivot_result = result.pivot(index='Product Name', columns='Month', values='Qty Sold').reset_index()
+            pivot_result.columns = pivot_result.columns.astype(str).rename(None)
 
-        pivot_result.columns = pivot_result.columns.astype(str)
+            pivot_result = pivot_result.fillna(0)
 
-        # Merge the price information
-        pivot_result = pivot_result.merge(price_mapping, on="Product Name", how="left")
+            # Reorder columns for better readability
+            pivot_result = pivot_result[['Product Name', 'Price', data.last_month, data.current_month, 'Growth']]
+        
+            # Reset index and start numbering from 1
+            pivot_result.reset_index(drop=True, inplace=True)
+            pivot_result.index += 1  # Start numbering from 1
+            return pivot_result
 
-        # Calculate growth between the current month and last month
-        pivot_result['Growth'] = ((pivot_result[current_month] - pivot_result[last_month]) / pivot_result[last_month]) * 100
+        def draw_consecutive_2_months(pivot_result):
+            if pivot_result is not None:
+                last_month, current_month = pivot_result.columns[2:4]
 
-        pivot_result = pivot_result.fillna(0)
+                # Display the dataframe, formatting the columns for better readability
+                show_table(pivot_result, {
+                    'Price': number(',.2f'),
+                    last_month: number(',.0f'),
+                    current_month: number(',.0f'),
+                    'Growth': number(',.0f', '%'),
+                }, key='stories_consecutive_2_months')
+    
+            else:
+                st.markdown(
+                    "<h1 style='color:#4A4A48; font-size: 16px; font-weight: bold; font-style: italic;'>Sorry... last 2 months data not available at the moment...</h1>", 
+                    unsafe_allow_html=True
+                )
 
-        # Format the columns for better readability
-        pivot_result[last_month] = pivot_result[last_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result[current_month] = pivot_result[current_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result['Growth'] = pivot_result['Growth'].apply(lambda x: f"{x:,.0f}%")
-        pivot_result["Price"] = pivot_result["Price"].apply(lambda x: f"{x:,.2f}")
+        panels.add('consecutive_2_months', consecutive_2_months, draw_consecutive_2_months)
 
-        # Reorder columns for better readability
-        pivot_result = pivot_result[['Product Name', 'Price', last_month, current_month, 'Growth']]
-        
-        # Reset index and start numbering from 1
-        pivot_result.reset_index(drop=True, inplace=True)
-        pivot_result.index += 1  # Start numbering from 1
-        
-# Custom CSS to ensure product names wrap properly
-        st.markdown("""
-        <style>
-            div[data-testid="stTable"] table {
-                table-layout: fixed !important;
-                width: 100% !important;
-            }
-            div[data-testid="stTable"] th:nth-child(1),
-            div[data-testid="stTable"] td:nth-child(1) {
-                white-space: normal !important;
-                word-wrap: break-word !important;
-                max-width: 300px !important;
-            }
-            div[data-testid="stTable"] th:nth-child(2),
-            div[data-testid="stTable"] th:nth-child(3),
-            div[data-testid="stTable"] td:nth-child(2),
-            div[data-testid="stTable"] td:nth-child(3) {
-                text-align: right !important;
-                min-width: 100px !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Display the dataframe
-        st.write(pivot_result.to_html(escape=False, index=True), unsafe_allow_html=True)
-    
-    else:
-        st.markdown(
-            "<h1 style='color:#4A4A48; font-size: 16px; font-weight: bold; font-style: italic;'>Sorry... last 2 months data not available at the moment...</h1>", 
-            unsafe_allow_html=True
-        )
 
 
 
 
+        # GROWTH ANALYSIS
 
-    # GROWTH ANALYSIS
+        st.markdown(
+        "<h1 style='color:#7D4E57; font-size: 24px; font-style: italic;'>Growth Analysis</h1>", 
+        unsafe_allow_html=True)
 
-    st.markdown(
-    "<h1 style='color:#7D4E57; font-size: 24px; font-style: italic;'>Growth Analysis</h1>", 
-    unsafe_allow_html=True)
 
 
+        # $0-20 PRODUCTS WITH MONTH-ON-MONTH GROWTH IN THE LAST 3 MONTHS
 
-    # $0-20 PRODUCTS WITH MONTH-ON-MONTH GROWTH IN THE LAST 3 MONTHS
+        st.markdown(
+        "<h1 style='color:blue; font-size: 18px; font-weight: bold; font-style: italic;'>All Products with <span style='color:green;'>Month-on-Month growth <span style='color:blue;'>in the last 3 months</h1>", 
+        unsafe_allow_html=True
+        )
 
-    st.markdown(
-    "<h1 style='color:blue; font-size: 18px; font-weight: bold; font-style: italic;'>All Products with <span style='color:green;'>Month-on-Month growth <span style='color:blue;'>in the last 3 months</h1>", 
-    unsafe_allow_html=True
-    )
-    
+        def growth_3_months():
+            data = prepare_data(df)
 
-    # Prepare the data (using the function)
-    df, third_last_month, last_month, current_month, last_three_months = prepare_data(df)
+            # Products sold in each of the last 3 months whose sales increased every month
+            pivot_result = month_growth(data.df, 3, rule='monotonic')
 
-    
-    # Ensure we have at least three months of data
-    if len(last_three_months) == 3:
-        
-        # Filter products sold in the last three months
-        products_sold_last_months = df[df['Month'].isin(last_three_months)]
-        
-        # Find common products sold across all three months
-        common_products = set(products_sold_last_months[products_sold_last_months['Month'] == current_month]['Product Name'])
-        common_products &= set(products_sold_last_months[products_sold_last_months['Month'] == last_month]['Product Name'])
-        common_products &= set(products_sold_last_months[products_sold_last_months['Month'] == third_last_month]['Product Name'])
-        
-        # Filter the DataFrame for these common products
-        common_products_df = products_sold_last_months[products_sold_last_months['Product Name'].isin(common_products)]
-        
-        # Group by Product Name and Month, summing the quantities sold
-        result = common_products_df.groupby(['Product Name', 'Month'])['Qty Sold'].sum().reset_index()
-        
-        # Pivot the data to get separate columns for each month's quantity sold
-        pivot_result = result.pivot(index='Product Name', columns='Month', values='Qty Sold').reset_index()
+            # Ensure we have at least three months of data
+            if pivot_result is None:
+                return None
 
-        pivot_result.columns = pivot_result.columns.astype(str)
-        
-        # Ensure all required months exist in the pivot table
-        for col in [third_last_month, last_month, current_month]:
-            if col not in pivot_result:
-                pivot_result[col] = 0  # Fill missing months with zero sales
+            pivot_result.columns = pivot_result.columns.astype(str)
         
-        # Calculate growth percentage
-        pivot_result['Growth'] = ((pivot_result[current_month] - pivot_result[third_last_month]) 
-                                / pivot_result[third_last_month]) * 100
+            # Adjust column ordering
+            pivot_result = pivot_result[['Product Name', data.third_last_month, data.last_month, data.current_month, 'Growth']]
         
-        # Filter rows where sales increase over the three months
-        growth_filtered = pivot_result[
-            (pivot_result[current_month] > pivot_result[last_month]) &
-            (pivot_result[last_month] > pivot_result[third_last_month])
-        ]
-
-        # Store whether growth exists
-        has_growth = not growth_filtered.empty
-        pivot_result = growth_filtered
-        
-        # Adjust column ordering
-        pivot_result = pivot_result[['Product Name', third_last_month, last_month, current_month, 'Growth']]
-        
-        # Format columns as readable numbers with commas
-        pivot_result[last_month] = pivot_result[last_month].apply(lambda x: f"{x:,}")
-        pivot_result[current_month] = pivot_result[current_month].apply(lambda x: f"{x:,}")
-        pivot_result[third_last_month] = pivot_result[third_last_month].apply(lambda x: f"{x:,}")
-        pivot_result['Growth'] = pivot_result['Growth'].apply(lambda x: f"{x:,.0f}%")
-        
-        # Reset index and start numbering from 1
-        pivot_result.reset_index(drop=True, inplace=True)
-        pivot_result.index += 1  # Start numbering from 1
-
-        pivot_result = pivot_result.fillna(0)
-
-
-        # Custom CSS to ensure product names wrap properly
-        st.markdown("""
-        <style>
-            div[data-testid="stTable"] table {
-                table-layout: fixed !important;
-                width: 100% !important;
-            }
-            div[data-testid="stTable"] th:nth-child(1),
-            div[data-testid="stTable"] td:nth-child(1) {
-                white-space: normal !important;
-                word-wrap: break-word !important;
-                max-width: 300px !important;
-            }
-            div[data-testid="stTable"] th:nth-child(2),
-            div[data-testid="stTable"] th:nth-child(3),
-            div[data-testid="stTable"] td:nth-child(2),
-            div[data-testid="stTable"] td:nth-child(3) {
-                text-align: right !important;
-                min-width: 100px !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Display the dataframe
-        st.write(pivot_result.to_html(escape=False, index=True), unsafe_allow_html=True)
+            # Reset index and start numbering from 1
+            pivot_result.reset_index(drop=True, inplace=True)
+            pivot_result.index += 1  # Start numbering from 1
+            return pivot_result
 
-        if not has_growth:
-            st.markdown(
-                "<p style='color: grey; font-size: 15px; font-style: italic;'>📉 No Month-on-Month growth detected for the selected period.</p>",
-                    unsafe_allow_html=True
-                )
+        def draw_growth_3_months(pivot_result):
+            if pivot_result is not None:
+                third_last_month, last_month, current_month = pivot_result.columns[1:4]
 
+                # Display the dataframe, formatting columns as readable numbers with commas
+                show_table(pivot_result, {
+                    third_last_month: number(),
+                    last_month: number(),
+                    current_month: number(),
+                    'Growth': number(',.0f', '%'),
+                }, key='stories_growth_3_months')
 
+                if pivot_result.empty:
+                    st.markdown(
+                        "<p style='color: grey; font-size: 15px; font-style: italic;'>📉 No Month-on-Month growth detected for the selected period.</p>",
+                            unsafe_allow_html=True
+                        )
 
-    else:
-        st.write("<h1 style='color:#BD7E58; font-size: 16px; font-weight: bold; font-style: italic;'>sorry.....Not enough data to calculate this growth.</h1>", 
-        unsafe_allow_html=True)
-        
 
 
-    # $0-20 PRODUCTS WITH MONTH-ON-MONTH GROWTH IN THE LAST 2 MONTHS
+            else:
+                st.write("<h1 style='color:#BD7E58; font-size: 16px; font-weight: bold; font-style: italic;'>sorry.....Not enough data to calculate this growth.</h1>", 
+                unsafe_allow_html=True)
 
-    st.markdown(
-    "<h1 style='color:#BD7E58; font-size: 18px; font-weight: bold; font-style: italic;'>$0-20 <span style='color:grey;'>Products with <span style='color:green;'>Month-on-Month Growth <span style='color:blue;'>in the last 2 months</h1>", 
-    unsafe_allow_html=True
-    )
+        panels.add('growth_3_months', growth_3_months, draw_growth_3_months)
+        
 
-    # Prepare the data (using the function)
-    df, third_last_month, last_month, current_month, last_three_months = prepare_data(df)
 
-    # Filter products sold in the last two or three months
-    products_sold_last_months = df[df['Month'].isin(last_three_months)]
+        # $0-20 PRODUCTS WITH MONTH-ON-MONTH GROWTH IN THE LAST 2 MONTHS
 
-    # Find common products sold across the selected months (intersection of product names)
-    if last_month:
-        # If three months are available, find products sold in all three months
-        common_products = set(products_sold_last_months[products_sold_last_months['Month'] == current_month]['Product Name']).intersection(
-            set(products_sold_last_months[products_sold_last_months['Month'] == last_month]['Product Name']),
+        st.markdown(
+        "<h1 style='color:#BD7E58; font-size: 18px; font-weight: bold; font-style: italic;'>$0-20 <span style='color:grey;'>Products with <span style='color:green;'>Month-on-Month Growth <span style='color:blue;'>in the last 2 months</h1>", 
+        unsafe_allow_html=True
         )
-        
-
-        # Filter the DataFrame for these common products
-        common_products_df = products_sold_last_months[products_sold_last_months['Product Name'].isin(common_products)]
 
-        # Group by Product Name and Month, and sum the quantities sold
-        result = common_products_df.groupby(['Product Name', 'Month'])['Qty Sold'].sum().reset_index()
+        def growth_2_months():
+            data = prepare_data(df)
 
-        # Pivot the data to get separate columns for each month's quantity sold
-        pivot_result = result.pivot(index='Product Name', columns='Month', values='Qty Sold').reset_index()
+            # Products sold in both of the last 2 months where current month sales > last month sales
+            pivot_result = month_growth(data.df, 2, rule='positive')
 
-        pivot_result.columns = pivot_result.columns.astype(str)
+            if pivot_result is None:
+                return None
 
-        # Filter the data to only include rows where:
-        # current month sales > last month sales AND last month sales > third last month sales
-        pivot_result = pivot_result[
-        (pivot_result[current_month] > pivot_result[last_month]) 
-        ]
+            pivot_result.columns = pivot_result.columns.astype(str)
 
-        # Calculate growth only if enough data is available
-        if last_month in pivot_result.columns:
-            # Calculate growth between the current month and last month
-            pivot_result['Growth'] = (pivot_result[current_month] - pivot_result[last_month])/pivot_result[last_month]*100
+            pivot_result = pivot_result[['Product Name', data.last_month, data.current_month,'Growth' ]]
 
+            # Reset index and start counting from 1
+            pivot_result.reset_index(drop=True, inplace=True)
+            pivot_result.index += 1  # Start numbering from 1
+            return pivot_result
 
-        pivot_result = pivot_result[['Product Name', last_month, current_month,'Growth' ]]
-   
+        def draw_growth_2_months(pivot_result):
+            if pivot_result is not None:
+                last_month, current_month = pivot_result.columns[1:3]
 
-        # Format the columns to show as readable numbers with commas
-        pivot_result[last_month] = pivot_result[last_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result[current_month] = pivot_result[current_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result['Growth'] = pivot_result['Growth'].apply(lambda x: f"{x:,.0f}%")
-        
+                # Display the dataframe, formatting the columns to show as readable numbers with commas
+                show_table(pivot_result, {
+                    last_month: number(',.0f'),
+                    current_month: number(',.0f'),
+                    'Growth': number(',.0f', '%'),
+                }, key='stories_growth_2_months')
 
-        # Reset index and start counting from 1
-        pivot_result.reset_index(drop=True, inplace=True)
-        pivot_result.index += 1  # Start numbering from 1
-        pivot_result = pivot_result.fillna(0)
-
-       # Custom CSS to ensure product names wrap properly
-        st.markdown("""
-        <style>
-            div[data-testid="stTable"] table {
-                table-layout: fixed !important;
-                width: 100% !important;
-            }
-            div[data-testid="stTable"] th:nth-child(1),
-            div[data-testid="stTable"] td:nth-child(1) {
-                white-space: normal !important;
-                word-wrap: break-word !important;
-                max-width: 300px !important;
-            }
-            div[data-testid="stTable"] th:nth-child(2),
-            div[data-testid="stTable"] th:nth-child(3),
-            div[data-testid="stTable"] td:nth-child(2),
-            div[data-testid="stTable"] td:nth-child(3) {
-                text-align: right !important;
-                min-width: 100px !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Display the dataframe
-        st.write(pivot_result.to_html(escape=False, index=True), unsafe_allow_html=True)
+            else:
+                st.write("<h1 style='color:#BD7E58; font-size: 16px; font-weight: bold; font-style: italic;'>sorry.....Not enough data to calculate this growth.</h1>", 
+                unsafe_allow_html=True)
 
-    else:
-        st.write("<h1 style='color:#BD7E58; font-size: 16px; font-weight: bold; font-style: italic;'>sorry.....Not enough data to calculate this growth.</h1>", 
-        unsafe_allow_html=True)
+        panels.add('growth_2_months', growth_2_months, draw_growth_2_months)
         
 
 
 
 
+        # All PRODUCTS WITH NEGATIVE GROWTH IN THE LAST 3 MONTHS
 
-# All PRODUCTS WITH NEGATIVE GROWTH IN THE LAST 3 MONTHS
-
-    st.markdown(
-    "<h1 style='color:grey; font-size: 18px; font-weight: bold; font-style: italic;'>All Products with <span style='color:green;'>Negative Growth<span style='color:blue;'> in the last 3 months</h1>", 
-    unsafe_allow_html=True
-    )
-
-    # Prepare the data (using the function)
-    df, third_last_month, last_month, current_month, last_three_months = prepare_data(df)
-
-    # Filter products sold in the last two or three months
-    products_sold_last_months = df[df['Month'].isin(last_three_months)]
-
-    # Find common products sold across the selected months (intersection of product names)
-    if third_last_month:
-        # If three months are available, find products sold in all three months
-        common_products = set(products_sold_last_months[products_sold_last_months['Month'] == current_month]['Product Name']).intersection(
-        set(products_sold_last_months[products_sold_last_months['Month'] == last_month]['Product Name']),
-        set(products_sold_last_months[products_sold_last_months['Month'] == third_last_month]['Product Name'])
-            )
-    
-        # If fewer than three months are available, find products sold in just the last two months
-        common_products = set(products_sold_last_months[products_sold_last_months['Month'] == current_month]['Product Name']).intersection(
-        set(products_sold_last_months[products_sold_last_months['Month'] == last_month]['Product Name'])
+        st.markdown(
+        "<h1 style='color:grey; font-size: 18px; font-weight: bold; font-style: italic;'>All Products with <span style='color:green;'>Negative Growth<span style='color:blue;'> in the last 3 months</h1>", 
+        unsafe_allow_html=True
         )
 
-        # Filter the DataFrame for these common products
-        common_products_df = products_sold_last_months[products_sold_last_months['Product Name'].isin(common_products)]
-
-        # Group by Product Name and Month, and sum the quantities sold
-        result = common_products_df.groupby(['Product Name', 'Month'])['Qty Sold'].sum().reset_index()
+        def negative_growth_3_months():
+            data = prepare_data(df)
 
-        # Pivot the data to get separate columns for each month's quantity sold
-        pivot_result = result.pivot(index='Product Name', columns='Month', values='Qty Sold').reset_index()
+            # Products sold in each of the last 3 months whose sales went down over the period
+            pivot_result = month_growth(data.df, 3, rule='negative')
 
-        # Calculate growth between the current month and last month
-        pivot_result['Growth'] = (pivot_result[current_month] - pivot_result[third_last_month])/pivot_result[third_last_month]*100
+            if pivot_result is None:
+                return None
 
-        # Filter for when GROWTH equals zero or Negative
-        pivot_result = pivot_result[pivot_result['Growth'] < 0]
+            # Adjust column ordering: If third month exists, include it
+            if data.third_last_month:
+                pivot_result = pivot_result[['Product Name', data.third_last_month, data.last_month, data.current_month, 'Growth']]
+            else:
+                pivot_result = pivot_result[['Product Name', data.last_month, data.current_month, 'Growth']]
 
-        # Format growth values to show as percentages and other values with commas
-        pivot_result[last_month] = pivot_result[last_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result[current_month] = pivot_result[current_month].apply(lambda x: f"{x:,.0f}")
-        pivot_result['Growth'] = pivot_result['Growth'].apply(lambda x: f"{x:,.0f}%")
-        
-
-        # If third month data is available, format it
-        if third_last_month:
-            pivot_result[third_last_month] = pivot_result[third_last_month].apply(lambda x: f"{x:,.0f}")
-            #pivot_result['Growth (Last vs 3rd Last)'] = pivot_result["Growth (Last vs 3rd Last)'].apply(lambda x: f"{x:,.0f}")
-
-        # Adjust column ordering: If third month exists, include it
-        if third_last_month:
-            pivot_result = pivot_result[['Product Name', third_last_month, last_month, current_month, 'Growth']]
-        else:
-            pivot_result = pivot_result[['Product Name', last_month, current_month, 'Growth']]
-
-        # Reset index and start counting from 1
-        pivot_result.reset_index(drop=True, inplace=True)
-        pivot_result.index += 1  # Start numbering from 1
-        pivot_result = pivot_result.fillna(0)
-    
-        # Custom CSS to ensure product names wrap properly
-        st.markdown("""
-        <style>
-            div[data-testid="stTable"] table {
-                table-layout: fixed !important;
-                width: 100% !important;
-            }
-            div[data-testid="stTable"] th:nth-child(1),
-            div[data-testid="stTable"] td:nth-child(1) {
-                white-space: normal !important;
-                word-wrap: break-word !important;
-                max-width: 300px !important;
-            }
-            div[data-testid="stTable"] th:nth-child(2),
-            div[data-testid="stTable"] th:nth-child(3),
-            div[data-testid="stTable"] td:nth-child(2),
-            div[data-testid="stTable"] td:nth-child(3) {
-                text-align: right !important;
-                min-width: 100px !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Display the dataframe
-        st.write(pivot_result.to_html(escape=False, index=True), unsafe_allow_html=True)
-
-    else:
-        st.write("<h1 style='color:#BD7E58; font-size: 16px; font-weight: bold; font-style: italic;'>.....Not enough data to calculate Last Vs 3rd last Month's growth.</h1>", 
-        unsafe_allow_html=True)
+            # Reset index and start counting from 1
+            pivot_result.reset_index(drop=True, inplace=True)
+            pivot_result.index += 1  # Start numbering from 1
+            return pivot_result
 
+        def draw_negative_growth_3_months(pivot_result):
+            if pivot_result is not None:
+                # Format growth values to show as percentages and month values with commas
+                formatters = {month: number(',.0f') for month in pivot_result.columns[1:-1]}
+                formatters['Growth'] = number(',.0f', '%')
 
+                # Display the dataframe
+                show_table(pivot_result, formatters, key='stories_negative_growth_3_months')
 
+            else:
+                st.write("<h1 style='color:#BD7E58; font-size: 16px; font-weight: bold; font-style: italic;'>.....Not enough data to calculate Last Vs 3rd last Month's growth.</h1>", 
+                unsafe_allow_html=True)
 
+        panels.add('negative_growth_3_months', negative_growth_3_months, draw_negative_growth_3_months)
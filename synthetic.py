@@ -0,0 +1,135 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from sales_data import SALES_COLUMNS, to_pandas
+from sources import PARQUET_PATH
+
+
+# Realistic category labels; only '$0-20', 'Excellent' and 'Beauty & Personal Care'
+# are special to the pages, the others just have to exist
+PRODUCT_CATEGORIES = [
+    "Beauty & Personal Care", "Home & Kitchen", "Electronics", "Toys & Games", "Clothing, Shoes & Jewelry",
+    "Health & Household", "Sports & Outdoors", "Office Products", "Pet Supplies", "Tools & Home Improvement",
+    "Grocery & Gourmet Food", "Baby Products", "Automotive", "Books", "Cell Phones & Accessories",
+    "Arts, Crafts & Sewing", "Garden & Outdoor", "Video Games", "Musical Instruments", "Industrial & Scientific",
+]
+PRICE_CATEGORIES = [(20, "$0-20"), (50, "$20-50"), (100, "$50-100"), (np.inf, "$100+")]
+RATING_CATEGORIES = [(3.5, "Poor"), (4.0, "Average"), (4.5, "Good"), (np.inf, "Excellent")]
+
+ADJECTIVES = ["Premium", "Portable", "Organic", "Wireless", "Compact", "Deluxe", "Classic", "Ultra", "Eco", "Smart"]
+NOUNS = ["Organizer", "Serum", "Charger", "Blender", "Puzzle", "Lamp", "Bottle", "Brush", "Speaker", "Backpack"]
+
+
+
+def default_products(n_rows):
+    """Number of distinct products for `n_rows` rows: about one product per 100 collected rows."""
+    return int(np.clip(n_rows // 100, 50, 200_000))
+
+
+def product_names(n_products, rng):
+    """Long, Amazon-like product titles, all distinct."""
+    adjectives = rng.choice(ADJECTIVES, n_products)
+    nouns = rng.choice(NOUNS, n_products)
+    return [
+        f"{adjective} {noun} {i:06d} - Durable, Lightweight and Easy to Use, Ideal Gift for Men and Women"
+        for i, (adjective, noun) in enumerate(zip(adjectives, nouns))
+    ]
+
+
+def bucket(values, buckets):
+    """Codes into `buckets` ((upper bound, label) pairs) and the labels."""
+    bounds = [bound for bound, _ in buckets]
+    return np.searchsorted(bounds, values, side="right").astype(np.int32), [label for _, label in buckets]
+
+
+def dictionary(codes, labels):
+    return pa.DictionaryArray.from_arrays(pa.array(codes, pa.int32()), pa.array(labels, pa.string()))
+
+
+def make_sales_table(n_rows=100_000, n_products=None, n_months=6, end="2024-10-31", seed=0):
+    """Synthetic Sales data as an Arrow table, with the columns and types BigQuery returns.
+
+    Rows are daily collections over the last `n_months` months (at most 12, since
+    Month holds the month name) up to `end`. Product popularity is skewed (a few
+    products sell most), every product has a fixed category, price band and rating,
+    and its sales drift up or down from month to month, so the growth panels have
+    something to show.
+    """
+    if not 1 <= n_months <= 12:
+        raise ValueError("n_months must be between 1 and 12")
+    rng = np.random.default_rng(seed)
+    n_products = n_products or default_products(n_rows)
+
+    # Product attributes
+    popularity = rng.permutation(1 / np.arange(1, n_products + 1) ** 0.8)  # Power law over shuffled ranks
+    popularity /= popularity.sum()
+    category = rng.integers(0, len(PRODUCT_CATEGORIES), n_products)
+    base_price = np.round(rng.lognormal(3.0, 0.8, n_products), 2)
+    rating = np.clip(rng.normal(4.2, 0.4, n_products), 1, 5)
+    base_qty = rng.lognormal(3.5, 1.0, n_products)
+    trend = rng.normal(0, 0.25, n_products)  # Monthly growth rate
+
+    # Collected rows
+    first_day = (pd.Timestamp(end) - pd.DateOffset(months=n_months) + pd.Timedelta(days=1)).normalize()
+    days = pd.date_range(first_day, end, freq="D")
+    day = rng.integers(0, len(days), n_rows)
+    product = rng.choice(n_products, n_rows, p=popularity)
+
+    # Everything date related is computed per day, then looked up per row
+    day_month_codes, month_labels = pd.factorize(days.strftime("%B"))
+    day_month_index = (days.year - first_day.year) * 12 + days.month - first_day.month
+
+    qty = rng.poisson(base_qty[product] * np.exp(trend[product] * day_month_index.to_numpy()[day])).astype(np.int64)
+    price = np.round(base_price[product] * rng.uniform(0.95, 1.05, n_rows), 2)
+    price_codes, price_labels = bucket(price, PRICE_CATEGORIES)
+    rating_codes, rating_labels = bucket(rating[product], RATING_CATEGORIES)
+
+    columns = {
+        "coll_date": pa.array(days.to_numpy().astype("datetime64[D]")[day], pa.date32()),
+        "Month": dictionary(day_month_codes[day], list(month_labels)),
+        "Product Name": dictionary(product, product_names(n_products, rng)),
+        "Product Category": dictionary(category[product], PRODUCT_CATEGORIES),
+        "Qty Sold": pa.array(qty, pa.int64()),
+        "Price": pa.array(price, pa.float64()),
+        "Price_cat": dictionary(price_codes, price_labels),
+        "Rating_cat": dictionary(rating_codes, rating_labels),
+    }
+    return pa.table([columns[column] for column in SALES_COLUMNS], names=SALES_COLUMNS)
+
+
+def make_sales(n_rows=100_000, n_products=None, n_months=6, end="2024-10-31", seed=0):
+    """Synthetic Sales frame with the same dtypes as sales_data.load_sales (see make_sales_table)."""
+    return to_pandas(make_sales_table(n_rows, n_products, n_months, end, seed))
+
+
+def write_sales(path, n_rows=100_000, n_products=None, n_months=6, end="2024-10-31", seed=0):
+    """Write synthetic Sales data to a Parquet file, e.g. for the DuckDB source."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Plain strings, as BigQuery hands them out
+    table = make_sales_table(n_rows, n_products, n_months, end, seed)
+    table = table.cast(pa.schema([
+        pa.field(field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type)
+        for field in table.schema
+    ]))
+    pq.write_table(table, path, compression="zstd")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic Sales data as Parquet, for SELLERWAVE_SOURCE=duckdb.")
+    parser.add_argument("path", nargs="?", default=PARQUET_PATH.replace("*", "sales"))
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--months", type=int, default=6, help="months of data (1-12)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_sales(args.path, args.rows, n_months=args.months, seed=args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
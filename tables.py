@@ -0,0 +1,91 @@
+import math
+
+import streamlit as st
+from streamlit import runtime
+
+from instrument import add_rows_out
+
+
+# Rows sent to the browser per table page
+PAGE_SIZE = 50
+
+# Custom CSS to ensure product names wrap properly (shared by every result table)
+TABLE_CSS = """
+        <style>
+            div[data-testid="stTable"] table {
+                table-layout: fixed !important;
+                width: 100% !important;
+            }
+            div[data-testid="stTable"] th:nth-child(1),
+            div[data-testid="stTable"] td:nth-child(1) {
+                white-space: normal !important;
+                word-wrap: break-word !important;
+                max-width: 300px !important;
+            }
+            div[data-testid="stTable"] th:nth-child(2),
+            div[data-testid="stTable"] th:nth-child(3),
+            div[data-testid="stTable"] td:nth-child(2),
+            div[data-testid="stTable"] td:nth-child(3) {
+                text-align: right !important;
+                min-width: 100px !important;
+            }
+        </style>
+        """
+
+
+
+def number(spec=",", suffix=""):
+    """Column formatter writing every value as `format(value, spec)` followed by `suffix`.
+
+    e.g. number(",.0f", "%") turns 1234.5 into "1,234%".
+    """
+    fmt = ("{:" + spec + "}" + suffix).format
+    return lambda column: column.map(fmt)
+
+
+def table_style():
+    """Add the result table CSS to the page; call once per page, before its tables."""
+    st.markdown(TABLE_CSS, unsafe_allow_html=True)
+
+
+def table_html(rows, formatters=None):
+    """`rows` as an HTML table, with `formatters` applied to a copy of them."""
+    rows = rows.copy()
+    for column, formatter in (formatters or {}).items():
+        rows[column] = formatter(rows[column])
+    return rows.to_html(escape=False, index=True)
+
+
+def paged_table(frame, formatters, key, page_size):
+    """One page of `frame` and its page selector."""
+    n_pages = math.ceil(len(frame) / page_size)
+    table = st.container()
+
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=key)
+    start = (page - 1) * page_size
+    visible = frame.iloc[start:start + page_size]
+    st.caption(f"Rows {start + 1:,}-{start + len(visible):,} of {len(frame):,}")
+
+    with table:
+        st.write(table_html(visible, formatters), unsafe_allow_html=True)
+
+
+# As a fragment, turning pages reruns the table only, not the page around it
+paged_table_fragment = st.fragment(paged_table)
+
+
+def show_table(frame, formatters=None, key=None, page_size=PAGE_SIZE):
+    """Display `frame` as an HTML table, one page of `page_size` rows at a time.
+
+    The frame keeps its numeric columns: `formatters` maps column names to
+    column formatters (see `number`) that are applied to the visible rows only.
+    Tables longer than a page get a page selector (see `paged_table`), which
+    needs a unique `key`.
+    """
+    add_rows_out(len(frame))
+    if len(frame) > page_size:
+        # Fragments only run under `streamlit run`; headless runs draw the table directly
+        draw = paged_table_fragment if runtime.exists() else paged_table
+        draw(frame, formatters, key, page_size)
+    else:
+        st.write(table_html(frame, formatters), unsafe_allow_html=True)
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+import instrument
+import sales_data
+from sources import DuckDBSource
+from synthetic import write_sales
+
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A SalesStore syncing from synthetic Parquet files through DuckDB, all under `tmp_path`."""
+    write_sales(str(tmp_path / "sales" / "part-0.parquet"), 5_000, n_months=3, seed=0)
+    source = DuckDBSource(str(tmp_path / "sales" / "*.parquet"))
+    store = sales_data.SalesStore(str(tmp_path / "sales.arrow"))
+
+    monkeypatch.setattr(sales_data, "get_source", lambda: source)
+    monkeypatch.setattr(sales_data, "get_store", lambda: store)
+    monkeypatch.setattr(instrument, "METRICS_PATH", str(tmp_path / "metrics.jsonl"))
+    return store
+
+
+def test_unchanged_source_keeps_version_and_frame(store):
+    df = sales_data.read_sales()
+    snapshot = os.stat(store.snapshot_path)
+
+    # Every sync reads the watermark date again, which is no change
+    for _ in range(2):
+        assert sales_data.read_sales(df) is df
+        assert store.version == 1
+
+    # The snapshot was only marked fresh, not rewritten
+    assert os.stat(store.snapshot_path).st_ino == snapshot.st_ino
+
+
+def test_new_rows_make_a_new_version(store, tmp_path):
+    df = sales_data.read_sales()
+    write_sales(str(tmp_path / "sales" / "part-1.parquet"), 1_000, n_months=1, end="2024-11-30", seed=1)
+
+    refreshed = sales_data.read_sales(df)
+    assert store.version == 2
+    assert sales_data.fingerprint(refreshed) == "sales-v2"
+    assert len(refreshed) == len(df) + 1_000
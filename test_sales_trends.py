@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_data import prepare_data
+from sales_trends import find_high_sales_products, month_growth
+from synthetic import make_sales
+
+
+# Filters the pages use (see stories.py)
+CHEAP = (('Price_cat', '$0-20'),)
+CARE_CHEAP = (('Product Category', 'Beauty & Personal Care'), ('Price_cat', '$0-20'))
+
+
+
+@pytest.fixture(scope="module")
+def sales():
+    return prepare_data(make_sales(20_000, n_months=4, seed=1)).df
+
+
+def pandas_month_growth(df, n_months, filters=(), rule='any', price=False):
+    """month_growth the way the pages computed it before sales_trends: sets of products and a pivot."""
+    months = df['Month'].drop_duplicates().tolist()
+    if len(months) < n_months:
+        return None
+    months = [str(month) for month in months[-n_months:]]
+
+    # Products sold in every month of the window
+    recent = df[df['Month'].isin(months)]
+    common_products = set.intersection(*(set(recent.loc[recent['Month'] == month, 'Product Name']) for month in months))
+    rows = recent[recent['Product Name'].isin(common_products)]
+    for column, value in filters:
+        rows = rows[rows[column] == value]
+
+    result = rows.groupby(['Product Name', 'Month'], observed=True)['Qty Sold'].sum().reset_index()
+    pivot_result = result.pivot(index='Product Name', columns='Month', values='Qty Sold').reset_index()
+    pivot_result.columns = pivot_result.columns.astype(str)
+    pivot_result = pivot_result.astype({'Product Name': str}).reindex(columns=['Product Name', *months])
+
+    if price:
+        price_mapping = rows.groupby('Product Name', observed=True)['Price'].first()
+        price_mapping.index = price_mapping.index.astype(str)
+        pivot_result['Price'] = pivot_result['Product Name'].map(price_mapping)
+
+    first, last = pivot_result[months[0]], pivot_result[months[-1]]
+    pivot_result['Growth'] = (last - first) / first * 100
+
+    if rule == 'positive':
+        pivot_result = pivot_result[pivot_result['Growth'] > 0]
+    elif rule == 'negative':
+        pivot_result = pivot_result[pivot_result['Growth'] < 0]
+    elif rule == 'monotonic':
+        increasing = np.ones(len(pivot_result), dtype=bool)
+        for before, after in zip(months, months[1:]):
+            increasing &= pivot_result[after] > pivot_result[before]
+        pivot_result = pivot_result[increasing]
+    return pivot_result
+
+
+def pandas_high_sales_products(data, window=3, threshold=1.1):
+    """find_high_sales_products the way the dashboard computed it before: one rolling mean per product."""
+    high_sales_products = []
+    for product, product_df in data.groupby('Product Name', observed=True):
+        if len(product_df) >= window:
+            product_df = product_df.sort_values(by='coll_date', kind='stable')
+            moving_avg = product_df['Qty Sold'].rolling(window=window).mean()
+            if product_df['Qty Sold'].iloc[-1] > threshold * moving_avg.iloc[-1]:
+                high_sales_products.append(product)
+    return high_sales_products
+
+
+def normalized(frame):
+    frame = frame.astype({'Product Name': str})
+    frame.columns = frame.columns.astype(str).rename(None)
+    return frame.sort_values('Product Name').reset_index(drop=True).astype({
+        column: float for column in frame.columns if column != 'Product Name'
+    })
+
+
+@pytest.mark.parametrize("n_months", [2, 3])
+@pytest.mark.parametrize("filters", [(), CHEAP, CARE_CHEAP])
+@pytest.mark.parametrize("rule", ['any', 'positive', 'negative', 'monotonic'])
+def test_month_growth_matches_pandas(sales, n_months, filters, rule):
+    price = bool(filters)
+    result = month_growth(sales, n_months, filters, rule, price=price)
+    expected = pandas_month_growth(sales, n_months, filters, rule, price=price)
+
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(normalized(result), normalized(expected[result.columns.astype(str)]))
+
+
+def test_month_growth_needs_enough_months(sales):
+    assert month_growth(sales, 5) is None
+
+
+def test_high_sales_products_match_rolling_mean(sales):
+    assert find_high_sales_products(sales) == pandas_high_sales_products(sales)